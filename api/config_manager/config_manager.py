@@ -1,16 +1,39 @@
 import json
 import os
-import copy
-import yaml
+import sys
+import atexit
+import weakref
+import stat
 import re
 import logging
-from typing import Dict, Any, Optional, List, TypeVar, Type
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, TypeVar, Type
 from pathlib import Path
-import dotenv
 from pydantic import BaseModel, ValidationError, Field
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-import asyncio
+import threading
+from api.utils import fast_clone
+
+# YAML模块在首次读写YAML配置文件时才导入
+_yaml = None
+_SafeLoader = None
+_SafeDumper = None
+
+def _load_yaml():
+    """
+    按需导入yaml模块，优先使用libyaml绑定的C实现加载器
+    """
+    global _yaml, _SafeLoader, _SafeDumper
+    
+    if _yaml is None:
+        import yaml
+        try:
+            from yaml import CSafeLoader as loader, CSafeDumper as dumper
+        except ImportError:
+            from yaml import SafeLoader as loader, SafeDumper as dumper
+        _SafeLoader, _SafeDumper = loader, dumper
+        _yaml = yaml
+    return _yaml
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, encoding='utf-8')
@@ -19,6 +42,33 @@ logger = logging.getLogger(__name__)
 # 类型变量用于泛型支持
 T = TypeVar('T', bound=BaseModel)
 
+@lru_cache(maxsize=1024)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """
+    拆分点表示法配置键并缓存结果（如 "app.debug" -> ("app", "debug")）
+    
+    各段字符串经过驻留，与模型字段名等驻留字符串比较时可直接按身份匹配
+    """
+    return tuple(sys.intern(k) for k in key.split("."))
+
+def _merge_dicts(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """
+    将source深度合并到target中（使用显式栈迭代，避免逐层递归调用）
+    """
+    stack = deque(((target, source),))
+    push = stack.append
+    pop = stack.pop
+    _dict = dict
+    
+    while stack:
+        t, s = pop()
+        for key, value in s.items():
+            current = t.get(key)
+            if type(current) is _dict and type(value) is _dict:
+                push((current, value))
+            else:
+                t[key] = value
+
 class ConfigModel(BaseModel):
     """
     基础配置模型类，用于验证和类型转换
@@ -56,6 +106,8 @@ class WebSocketConfig(ConfigModel):
     """
     enabled: bool = Field(default=True, env="WEBSOCKET_ENABLED")
     path: str = Field(default="/ws", env="WEBSOCKET_PATH")
+    per_message_deflate: bool = Field(default=True, env="WEBSOCKET_PER_MESSAGE_DEFLATE")
+    redis_url: Optional[str] = Field(default=None, env="WEBSOCKET_REDIS_URL")
 
 class FileUploadConfig(ConfigModel):
     """
@@ -105,36 +157,131 @@ class CognotConfig(ConfigModel):
     modules: ModulesConfig = ModulesConfig()
     proxy: ProxyConfig = ProxyConfig()
 
-class ConfigChangeHandler(FileSystemEventHandler):
+# 配置节名称 -> 配置节模型
+_SECTION_TYPES: Dict[str, Type[ConfigModel]] = {
+    "app": AppConfig,
+    "server": ServerConfig,
+    "database": DatabaseConfig,
+    "websocket": WebSocketConfig,
+    "file_upload": FileUploadConfig,
+    "security": SecurityConfig,
+    "modules": ModulesConfig,
+    "proxy": ProxyConfig,
+}
+
+# 默认配置原型，只在导入时生成一次，各实例使用其副本
+_DEFAULT_CONFIG: Dict[str, Any] = CognotConfig().model_dump()
+
+_TRUTHY = frozenset(("1", "true", "yes", "on", "t"))
+
+def _env_bool(value: str) -> bool:
+    return value.strip().lower() in _TRUTHY
+
+def _env_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+# 字段类型 -> 环境变量解析函数
+_ENV_PARSERS = {
+    bool: _env_bool,
+    int: int,
+    str: str,
+    List[str]: _env_list,
+    Optional[str]: str,
+}
+
+def _collect_env_fields() -> List[Tuple[str, str, str, Any]]:
+    """
+    收集各配置节字段声明的环境变量名，生成 (配置节, 字段, 环境变量名, 解析函数) 表
+    """
+    env_fields = []
+    for section, section_type in _SECTION_TYPES.items():
+        for field_name, field in section_type.model_fields.items():
+            extra = field.json_schema_extra
+            env_name = extra.get("env") if isinstance(extra, dict) else None
+            parser = _ENV_PARSERS.get(field.annotation)
+            if env_name and parser is not None:
+                env_fields.append((section, field_name, env_name, parser))
+    return env_fields
+
+_ENV_FIELDS = _collect_env_fields()
+
+def _construct_config_model(config: Dict[str, Any]) -> CognotConfig:
+    """
+    从已验证的配置字典直接构造配置模型，跳过Pydantic验证
     """
-    配置文件变化处理器
+    sections = {}
+    for name, value in config.items():
+        section_type = _SECTION_TYPES.get(name)
+        if section_type is not None and type(value) is dict:
+            value = section_type.model_construct(**value)
+        sections[name] = value
+    return CognotConfig.model_construct(**sections)
+
+class ConfigChangeHandler:
     """
+    配置文件变化处理器（实现watchdog事件处理器的dispatch接口，避免在导入时加载watchdog）
+    """
+    # 防抖延迟（秒）
+    DEBOUNCE_DELAY = 0.5
+
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self.debounce_timer = None
+        self._lock = threading.Lock()
+
+    def dispatch(self, event):
+        """
+        由watchdog的监控线程调用，分发文件系统事件
+        """
+        if event.event_type == "modified":
+            self.on_modified(event)
 
     def on_modified(self, event):
         """
-        当配置文件被修改时触发
+        当配置文件被修改时触发（在watchdog的监控线程中调用）
         """
         if event.is_directory:
             return
         
         file_path = Path(event.src_path)
         if file_path.suffix in ['.json', '.yaml', '.yml']:
-            # 使用防抖机制避免频繁触发
+            # 文件已变化，丢弃其解析缓存
+            self.config_manager.invalidate_parse_cache(file_path.name)
+            
+            # 使用防抖机制避免频繁触发；监控线程中没有事件循环，使用定时器线程
+            with self._lock:
+                if self.debounce_timer:
+                    self.debounce_timer.cancel()
+                self.debounce_timer = threading.Timer(self.DEBOUNCE_DELAY, self._reload_config, args=(file_path,))
+                self.debounce_timer.daemon = True
+                self.debounce_timer.start()
+
+    def _reload_config(self, file_path: Path):
+        """
+        防抖结束后重载配置
+        """
+        try:
+            self.config_manager.reload_config()
+            logger.info(f"配置文件 {file_path} 已重载")
+        except Exception as e:
+            logger.error(f"重载配置文件 {file_path} 失败: {e}")
+
+    def cancel(self):
+        """
+        取消尚未执行的重载
+        """
+        with self._lock:
             if self.debounce_timer:
                 self.debounce_timer.cancel()
-            
-            async def reload_config():
-                await asyncio.sleep(0.5)  # 500ms防抖
-                try:
-                    await self.config_manager.reload_config()
-                    logger.info(f"配置文件 {file_path} 已重载")
-                except Exception as e:
-                    logger.error(f"重载配置文件 {file_path} 失败: {e}")
-            
-            self.debounce_timer = asyncio.create_task(reload_config())
+                self.debounce_timer = None
+
+def _stop_watchdog_at_exit(manager_ref: "weakref.ref[ConfigManager]"):
+    """
+    解释器退出时停止仍在运行的配置监控
+    """
+    manager = manager_ref()
+    if manager is not None:
+        manager._stop_watchdog()
 
 class ConfigManager:
     """
@@ -148,44 +295,97 @@ class ConfigManager:
         # 加载环境变量
         self.env_file = Path(env_file)
         if self.env_file.exists():
+            import dotenv
             dotenv.load_dotenv(self.env_file)
         
         # 配置存储
         self.config: Dict[str, Any] = {}
         self.config_files: Dict[str, Path] = {}
+        # 解析缓存: 文件名 -> (st_mtime_ns, st_size, 配置类型, 验证后的配置)
+        self._parse_cache: Dict[str, Tuple[int, int, Optional[str], Dict[str, Any]]] = {}
         self.config_model: CognotConfig = CognotConfig()
         
         # 配置热重载
         self.enable_watch = enable_watch
         self.observer = None
+        self._watch_handler = None
         
         # 初始化配置
         self._load_default_config()
         self._load_env_config()
         
-        # 启动配置监控
+        # 启动配置监控，解释器退出时停止（弱引用，不延长实例生命周期）
         if self.enable_watch:
             self._start_watchdog()
+            atexit.register(_stop_watchdog_at_exit, weakref.ref(self))
     
     def _load_default_config(self):
         """
         从Pydantic模型加载默认配置
         """
-        self.config = self.config_model.dict()
+        self.config = fast_clone(_DEFAULT_CONFIG)
     
     def _load_env_config(self):
         """
-        从环境变量加载配置（使用Pydantic自动处理）
+        从环境变量加载配置（按字段声明的env名称覆盖默认值）
         """
-        # Pydantic已经在模型初始化时处理了环境变量
-        # 这里只需要更新配置字典
-        env_config = self.config_model.dict()
-        self._merge_config(self.config, env_config)
+        environ = os.environ
+        env_config: Dict[str, Dict[str, Any]] = {}
+        for section, field_name, env_name, parser in _ENV_FIELDS:
+            value = environ.get(env_name)
+            if value is None:
+                continue
+            try:
+                env_config.setdefault(section, {})[field_name] = parser(value)
+            except ValueError:
+                logger.warning(f"环境变量格式无效 {env_name}: {value}")
+        
+        if env_config:
+            self._merge_config(self.config, env_config)
+            self._update_config_model()
     
     def load_config_file(self, file_name: str, config_type: Optional[str] = None) -> bool:
         """
         加载配置文件，支持JSON和YAML格式
         
+        Args:
+            file_name: 配置文件名
+            config_type: 配置类型（可选）
+            
+        Returns:
+            是否成功加载
+        """
+        if not self._load_config_file(file_name, config_type):
+            return False
+        
+        # 更新Pydantic模型
+        self._update_config_model()
+        return True
+    
+    def _batch_load(self, file_names: List[str]) -> int:
+        """
+        批量加载配置文件，全部加载完成后只更新一次Pydantic模型
+        
+        Args:
+            file_names: 配置文件名列表
+            
+        Returns:
+            成功加载的文件数
+        """
+        loaded = 0
+        for file_name in file_names:
+            if self._load_config_file(file_name):
+                loaded += 1
+        
+        if loaded:
+            # 配置文件内容均已验证
+            self._update_config_model(trusted=True)
+        return loaded
+    
+    def _load_config_file(self, file_name: str, config_type: Optional[str] = None) -> bool:
+        """
+        加载配置文件并合并到配置字典（不更新Pydantic模型）
+        
         Args:
             file_name: 配置文件名
             config_type: 配置类型（可选）
@@ -195,44 +395,128 @@ class ConfigManager:
         """
         config_path = self.config_dir / file_name
         
-        if config_path.exists() and config_path.is_file():
-            try:
-                with open(config_path, "r", encoding="utf-8") as f:
-                    if file_name.endswith('.json'):
-                        file_config = json.load(f)
-                    elif file_name.endswith(('.yaml', '.yml')):
-                        file_config = yaml.safe_load(f)
-                    else:
-                        logger.error(f"不支持的配置文件格式: {file_name}")
-                        return False
-                
-                # 验证配置
-                self._validate_config(file_config)
-                
-                # 合并配置
-                if config_type:
-                    if config_type not in self.config:
-                        self.config[config_type] = {}
-                    self._merge_config(self.config[config_type], file_config)
-                    self.config_files[config_type] = config_path
-                else:
-                    self._merge_config(self.config, file_config)
-                    self.config_files[file_name] = config_path
-                
-                # 更新Pydantic模型
-                self._update_config_model()
-                
-                logger.info(f"成功加载配置文件: {file_name}")
-                return True
-            except ValidationError as e:
-                logger.error(f"配置验证失败 {file_name}: {e}")
-                return False
-            except Exception as e:
-                logger.error(f"加载配置文件失败 {file_name}: {e}")
+        # 一次stat同时判断文件是否存在、是否为普通文件，并供解析缓存使用
+        try:
+            file_stat = os.stat(config_path)
+        except OSError:
+            file_stat = None
+        
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+            logger.warning(f"配置文件不存在: {file_name}")
+            return False
+        
+        try:
+            # 读取时已按配置节模型完成验证
+            file_config = self._read_config_file(config_path, file_name, file_stat, config_type)
+            if file_config is None:
                 return False
+            
+            # 合并配置
+            if config_type:
+                if config_type not in self.config:
+                    self.config[config_type] = {}
+                self._merge_config(self.config[config_type], file_config)
+                self.config_files[config_type] = config_path
+            else:
+                self._merge_config(self.config, file_config)
+                self.config_files[file_name] = config_path
+            
+            logger.info(f"成功加载配置文件: {file_name}")
+            return True
+        except ValidationError as e:
+            logger.error(f"配置验证失败 {file_name}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"加载配置文件失败 {file_name}: {e}")
+            return False
+    
+    def _read_config_file(self, config_path: Path, file_name: str, file_stat: os.stat_result,
+                          config_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        读取、解析并验证配置文件，文件的mtime和大小未变化时直接复用上次的结果
+        
+        Args:
+            config_path: 配置文件路径
+            file_name: 配置文件名
+            file_stat: 配置文件的stat结果
+            config_type: 配置类型（可选）
+            
+        Returns:
+            验证后的配置字典（只包含文件中设置的字段），格式不支持时返回None
+            
+        Raises:
+            ValidationError: 配置验证失败
+        """
+        if not file_name.endswith(('.json', '.yaml', '.yml')):
+            logger.error(f"不支持的配置文件格式: {file_name}")
+            return None
+        
+        cached = self._parse_cache.get(file_name)
+        if (cached is not None and cached[0] == file_stat.st_mtime_ns
+                and cached[1] == file_stat.st_size and cached[2] == config_type):
+            # 合并时会引用结果中的嵌套字典，因此返回副本
+            return fast_clone(cached[3])
+        
+        with open(config_path, "rb") as f:
+            content = f.read()
+        
+        section_type = _SECTION_TYPES.get(config_type) if config_type else None
+        if section_type is not None and file_name.endswith('.json'):
+            # 解析与验证在pydantic-core中一次完成
+            file_config = section_type.model_validate_json(content).model_dump(exclude_unset=True)
+        else:
+            if file_name.endswith('.json'):
+                file_config = json.loads(content)
+            else:
+                yaml = _load_yaml()
+                file_config = yaml.load(content, Loader=_SafeLoader)
+            file_config = self._validate_file_config(file_config, config_type)
+        
+        self._parse_cache[file_name] = (file_stat.st_mtime_ns, file_stat.st_size, config_type, file_config)
+        return fast_clone(file_config)
+    
+    def _validate_file_config(self, file_config: Any, config_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        按配置节模型逐节验证配置文件内容
+        
+        Args:
+            file_config: 解析后的配置文件内容
+            config_type: 配置类型（可选）
+            
+        Returns:
+            规范化后的配置字典（只包含文件中设置的字段）
+            
+        Raises:
+            ValidationError: 配置验证失败
+        """
+        if not isinstance(file_config, dict):
+            raise ValueError(f"配置文件内容必须是字典: {type(file_config).__name__}")
+        
+        if config_type:
+            section_type = _SECTION_TYPES.get(config_type)
+            if section_type is None:
+                return file_config
+            return section_type.model_validate(file_config).model_dump(exclude_unset=True)
         
-        logger.warning(f"配置文件不存在: {file_name}")
-        return False
+        validated = {}
+        for name, value in file_config.items():
+            section_type = _SECTION_TYPES.get(name)
+            if section_type is not None:
+                value = section_type.model_validate(value).model_dump(exclude_unset=True)
+            validated[name] = value
+        return validated
+    
+    def invalidate_parse_cache(self, file_name: Optional[str] = None):
+        """
+        清除配置文件解析缓存
+        
+        Args:
+            file_name: 配置文件名（为空时清除全部）
+        """
+        if file_name is None:
+            self._parse_cache.clear()
+        else:
+            self._parse_cache.pop(file_name, None)
     
     def save_config_file(self, config_type: str = "app", format: str = "json") -> bool:
         """
@@ -255,7 +539,8 @@ class ConfigManager:
             with open(config_path, "w", encoding="utf-8") as f:
                 config_data = self.config.get(config_type, {})
                 if format == "yaml":
-                    yaml.dump(config_data, f, default_flow_style=False, allow_unicode=True)
+                    yaml = _load_yaml()
+                    yaml.dump(config_data, f, Dumper=_SafeDumper, default_flow_style=False, allow_unicode=True)
                 else:
                     json.dump(config_data, f, indent=2, ensure_ascii=False)
             
@@ -277,7 +562,7 @@ class ConfigManager:
         Returns:
             配置值或默认值
         """
-        keys = key.split(".")
+        keys = _split_key(key)
         value = self.config
         
         try:
@@ -333,15 +618,17 @@ class ConfigManager:
         Returns:
             是否成功设置
         """
-        keys = key.split(".")
+        keys = _split_key(key)
         config = self.config
         
         try:
             # 创建嵌套结构
             for k in keys[:-1]:
-                if k not in config or not isinstance(config[k], dict):
-                    config[k] = {}
-                config = config[k]
+                current = config.get(k)
+                if type(current) is not dict:
+                    current = {}
+                    config[k] = current
+                config = current
             
             # 设置值
             config[keys[-1]] = value
@@ -367,13 +654,13 @@ class ConfigManager:
         """
         try:
             # 验证配置
-            self._validate_config(config_dict)
+            config_model = self._validate_config(config_dict)
             
             # 合并配置
             self._merge_config(self.config, config_dict)
             
-            # 更新Pydantic模型
-            self._update_config_model()
+            # 合并结果与验证时一致，直接使用已验证的模型
+            self.config_model = config_model
             
             logger.info("成功更新配置")
             return True
@@ -394,7 +681,7 @@ class ConfigManager:
         Returns:
             配置节的深拷贝
         """
-        return copy.deepcopy(self.config.get(section))
+        return fast_clone(self.config.get(section))
     
     def set_section(self, section: str, config_dict: Dict[str, Any]) -> bool:
         """
@@ -408,14 +695,18 @@ class ConfigManager:
             是否成功设置
         """
         try:
-            # 验证配置
-            self._validate_config({section: config_dict})
-            
-            # 设置配置节
-            self.config[section] = copy.deepcopy(config_dict)
-            
-            # 更新Pydantic模型
-            self._update_config_model()
+            section_type = _SECTION_TYPES.get(section)
+            if section_type is not None:
+                # 验证配置节，转储结果即为新字典，无需再深拷贝调用方的数据
+                section_model = section_type.model_validate(config_dict)
+                self.config[section] = section_model.model_dump()
+                self.config_model = self.config_model.model_copy(update={section: section_model})
+            else:
+                # 设置配置节
+                self.config[section] = fast_clone(config_dict)
+                
+                # 更新Pydantic模型（其余配置节均已验证）
+                self._update_config_model(trusted=True)
             
             logger.info(f"成功设置配置节: {section}")
             return True
@@ -436,7 +727,7 @@ class ConfigManager:
         Returns:
             是否成功删除
         """
-        keys = key.split(".")
+        keys = _split_key(key)
         config = self.config
         
         try:
@@ -448,8 +739,8 @@ class ConfigManager:
             if keys[-1] in config:
                 del config[keys[-1]]
                 
-                # 更新Pydantic模型
-                self._update_config_model()
+                # 更新Pydantic模型（删除不会引入未验证的值，缺失字段使用默认值）
+                self._update_config_model(trusted=True)
                 
                 logger.debug(f"删除配置: {key}")
                 return True
@@ -474,7 +765,7 @@ class ConfigManager:
         Returns:
             配置字典的深拷贝
         """
-        return copy.deepcopy(self.config)
+        return fast_clone(self.config)
     
     def reload_config(self):
         """
@@ -486,9 +777,13 @@ class ConfigManager:
         self._load_default_config()
         self._load_env_config()
         
-        # 重新加载所有配置文件
-        for config_type, config_path in self.config_files.items():
-            self.load_config_file(config_path.name, config_type)
+        # 重新加载所有配置文件，完成后只更新一次模型
+        for config_type, config_path in list(self.config_files.items()):
+            # 完整配置文件以文件名登记，不属于某个配置节
+            if config_type == config_path.name:
+                config_type = None
+            self._load_config_file(config_path.name, config_type)
+        self._update_config_model(trusted=True)
         
         logger.info("配置重新加载完成")
     
@@ -497,9 +792,11 @@ class ConfigManager:
         启动配置文件监控
         """
         try:
+            from watchdog.observers import Observer
+            
             self.observer = Observer()
-            handler = ConfigChangeHandler(self)
-            self.observer.schedule(handler, str(self.config_dir), recursive=False)
+            self._watch_handler = ConfigChangeHandler(self)
+            self.observer.schedule(self._watch_handler, str(self.config_dir), recursive=False)
             self.observer.start()
             logger.info(f"启动配置监控: {self.config_dir}")
         except Exception as e:
@@ -510,6 +807,9 @@ class ConfigManager:
         """
         停止配置文件监控
         """
+        if self._watch_handler:
+            self._watch_handler.cancel()
+            self._watch_handler = None
         if self.observer:
             self.observer.stop()
             self.observer.join()
@@ -523,6 +823,9 @@ class ConfigManager:
         Args:
             config_dict: 要验证的配置字典
             
+        Returns:
+            验证通过的配置模型
+            
         Raises:
             ValidationError: 配置验证失败
         """
@@ -530,42 +833,51 @@ class ConfigManager:
             # 尝试更新模型来验证配置
             updated_dict = self.config.copy()
             self._merge_config(updated_dict, config_dict)
-            CognotConfig(**updated_dict)
+            return CognotConfig.model_validate(updated_dict)
         except Exception as e:
             logger.error(f"配置验证失败: {config_dict}")
             raise
     
-    def _update_config_model(self):
+    def _update_config_model(self, trusted: bool = False):
         """
         更新Pydantic配置模型
+        
+        Args:
+            trusted: 配置字典中的值是否均已验证（是则跳过完整验证）
         """
+        if trusted:
+            self.config_model = _construct_config_model(self.config)
+            return
+        
         try:
-            self.config_model = CognotConfig(**self.config)
+            self.config_model = CognotConfig.model_validate(self.config)
             logger.debug("更新配置模型成功")
         except ValidationError as e:
             logger.error(f"更新配置模型失败: {e}")
             # 保留旧模型
     
-    def __del__(self):
+    def close(self):
         """
-        清理资源
+        清理资源（停止配置监控）
         """
         self._stop_watchdog()
     
-    def _merge_config(self, target: Dict[str, Any], source: Dict[str, Any]):
-        
-        for key, value in source.items():
-            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-                
-                self._merge_config(target[key], value)
-            else:
-                
-                target[key] = value
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+    
+    # 深度合并配置字典
+    _merge_config = staticmethod(_merge_dicts)
 
 config_manager = ConfigManager()
 
-# 加载默认配置文件
-config_manager.load_config_file("app.json")
-config_manager.load_config_file("server.json")
-config_manager.load_config_file("database.json")
-config_manager.load_config_file("cognot.yaml")  # 支持YAML格式的完整配置文件
+# 加载默认配置文件（cognot.yaml为支持YAML格式的完整配置文件）
+config_manager._batch_load(["app.json", "server.json", "database.json", "cognot.yaml"])
@@ -3,10 +3,21 @@
 import os
 import json
 import uuid
+import atexit
+import asyncio
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
+from api.utils import fast_clone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class PresetManager:
     
+    # 延迟写入时间（秒）
+    FLUSH_DELAY = 0.1
     
     def __init__(self, storage_file: str = "presets.json"):
         
@@ -21,69 +32,102 @@ class PresetManager:
         
         if not os.path.exists(self.presets_file):
             self._save_presets([])
+        
+        # 内存索引: 预设ID -> 预设
+        self._by_id: Dict[str, Dict[str, Any]] = {
+            preset["id"]: preset for preset in self._load_presets()
+        }
+        
+        # 延迟写入: 短时间内的多次修改合并为一次写文件
+        self._dirty = False
+        self._flush_handle = None
+        atexit.register(self.flush)
     
     def _load_presets(self) -> List[Dict[str, Any]]:
         
         try:
-            with open(self.presets_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.presets_file, 'rb') as f:
+                data = f.read()
+            if orjson is not None:
+                return orjson.loads(data)
+            return json.loads(data.decode('utf-8'))
         except (json.JSONDecodeError, FileNotFoundError):
             return []
     
     def _save_presets(self, presets: List[Dict[str, Any]]):
         
-        with open(self.presets_file, 'w', encoding='utf-8') as f:
-            json.dump(presets, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            data = orjson.dumps(presets, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(presets, indent=2, ensure_ascii=False).encode('utf-8')
+        # 先写临时文件再原子替换，避免写入中断导致文件损坏
+        tmp_file = self.presets_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, self.presets_file)
     
-    def get_all_presets(self) -> List[Dict[str, Any]]:
+    def _schedule_flush(self):
         
-        return self._load_presets()
-    
-    def get_preset(self, preset_id: str) -> Optional[Dict[str, Any]]:
+        self._dirty = True
+        if self._flush_handle is not None:
+            return
         
-        presets = self._load_presets()
-        return next((preset for preset in presets if preset["id"] == preset_id), None)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有运行中的事件循环时直接写入
+            self.flush()
+            return
+        
+        self._flush_handle = loop.call_later(self.FLUSH_DELAY, self.flush)
     
-    def save_preset(self, preset_data: Dict[str, Any]) -> Dict[str, Any]:
+    def flush(self):
         
-        presets = self._load_presets()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
         
+        if self._dirty:
+            self._dirty = False
+            self._save_presets(list(self._by_id.values()))
+    
+    def get_all_presets(self) -> List[Dict[str, Any]]:
         
-        preset_id = preset_data.get("id", str(uuid.uuid4()))
+        # 返回深拷贝，调用方修改结果（包括嵌套的data）不会绕过save_preset改动内存中的预设
+        return [fast_clone(preset) for preset in self._by_id.values()]
+    
+    def get_preset(self, preset_id: str) -> Optional[Dict[str, Any]]:
         
+        preset = self._by_id.get(preset_id)
+        return fast_clone(preset) if preset is not None else None
+    
+    def save_preset(self, preset_data: Dict[str, Any]) -> Dict[str, Any]:
         
-        preset_index = next((i for i, p in enumerate(presets) if p["id"] == preset_id), None)
+        preset_id = preset_data.get("id") or str(uuid.uuid4())
+        existing = self._by_id.get(preset_id)
+        now = datetime.now(timezone.utc).isoformat()
         
         
         preset = {
             "id": preset_id,
             "name": preset_data.get("name", "Untitled Preset"),
-            "data": preset_data.get("data", {}),
-            "createdAt": preset_data.get("createdAt", str(uuid.uuid4())) if preset_index is None else presets[preset_index]["createdAt"],
-            "updatedAt": str(uuid.uuid4())
+            # 复制传入的data，调用方之后修改自己的字典不会影响已保存的预设
+            "data": fast_clone(preset_data.get("data", {})),
+            "createdAt": preset_data.get("createdAt", now) if existing is None else existing["createdAt"],
+            "updatedAt": now
         }
         
-        if preset_index is not None:
-            
-            presets[preset_index] = preset
-        else:
-            
-            presets.append(preset)
-        
+        self._by_id[preset_id] = preset
+        self._schedule_flush()
         
-        self._save_presets(presets)
-        
-        return preset
+        return fast_clone(preset)
     
     def delete_preset(self, preset_id: str) -> bool:
         
-        presets = self._load_presets()
-        new_presets = [preset for preset in presets if preset["id"] != preset_id]
-        
-        if len(new_presets) < len(presets):
-            self._save_presets(new_presets)
-            return True
+        if self._by_id.pop(preset_id, None) is None:
+            return False
         
-        return False
+        self._schedule_flush()
+        return True
 
 preset_manager = PresetManager()
\ No newline at end of file
@@ -1,15 +1,134 @@
 import os
 import uuid
+import errno
+import stat
 import shutil
-from typing import Dict, List, Optional, BinaryIO
+import heapq
+import time
+import asyncio
+import threading
+from operator import itemgetter
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, BinaryIO, Iterator, Tuple, Union
 from pathlib import Path
 import mimetypes
 
+# 零拷贝复制单次系统调用的最大字节数
+_ZERO_COPY_CHUNK = 1 << 30
+# 无法零拷贝时使用的缓冲区大小
+_COPY_BUFSIZE = 1 << 20
+# 这些错误表示当前文件组合不支持该复制方式，应退回下一种方式
+_ZERO_COPY_FALLBACK_ERRNOS = frozenset((errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP))
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, _ZERO_COPY_CHUNK, offset)
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int) -> int:
+    return os.sendfile(dst_fd, src_fd, offset, _ZERO_COPY_CHUNK)
+
+# 按优先级排列的内核内复制方式
+_ZERO_COPY_METHODS = tuple(
+    method for method, available in (
+        (_copy_file_range, hasattr(os, "copy_file_range")),
+        (_sendfile, hasattr(os, "sendfile")),
+    ) if available
+)
+
+_upload_time_key = itemgetter("upload_time")
+
+# 文件元数据缓存的容量和有效期（秒）
+_STAT_CACHE_SIZE = 10000
+_STAT_CACHE_TTL = 5.0
+_NEGATIVE_CACHE_TTL = 1.0
+
+# 批量读取的随机字节池，每次os.urandom可生成256个UUID
+_RAND_POOL_SIZE = 4096
+_rand_pool = b""
+_rand_pos = 0
+_rand_lock = threading.Lock()
+
+def _fast_uuid4() -> uuid.UUID:
+    """
+    从批量读取的随机字节池生成UUID4，避免每个UUID一次os.urandom系统调用
+    """
+    global _rand_pool, _rand_pos
+    
+    with _rand_lock:
+        if _rand_pos + 16 > len(_rand_pool):
+            _rand_pool = os.urandom(_RAND_POOL_SIZE)
+            _rand_pos = 0
+        raw = bytearray(_rand_pool[_rand_pos:_rand_pos + 16])
+        _rand_pos += 16
+    
+    # 设置RFC 4122版本号和变体位
+    raw[6] = (raw[6] & 0x0f) | 0x40
+    raw[8] = (raw[8] & 0x3f) | 0x80
+    return uuid.UUID(bytes=bytes(raw))
+
+def _reset_rand_pool() -> None:
+    global _rand_pool, _rand_pos
+    _rand_pool = b""
+    _rand_pos = 0
+
+# fork出的子进程不能沿用父进程的随机字节池，否则会生成重复的UUID
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_rand_pool)
+
+def _stat_regular_file(path: Union[str, Path]) -> Optional[os.stat_result]:
+    """
+    对路径执行一次stat，是普通文件时返回stat结果，否则返回None
+    """
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+def _copy_stream(src: BinaryIO, dst: BinaryIO) -> None:
+    """
+    将上传流写入目标文件；源流有真实文件描述符时在内核中直接复制，避免经过用户态缓冲区
+    """
+    # 未落盘的SpooledTemporaryFile调用fileno()会先整体写入临时文件，反而多一次复制
+    if not getattr(src, "_rolled", True):
+        shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+        return
+    
+    try:
+        src_fd = src.fileno()
+        offset = src.tell()
+    except (AttributeError, OSError, ValueError):
+        shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+        return
+    
+    dst.flush()
+    dst_fd = dst.fileno()
+    
+    for copy in _ZERO_COPY_METHODS:
+        try:
+            while True:
+                copied = copy(src_fd, dst_fd, offset)
+                if copied == 0:
+                    src.seek(offset)
+                    return
+                offset += copied
+        except OSError as e:
+            if e.errno not in _ZERO_COPY_FALLBACK_ERRNOS:
+                raise
+    
+    src.seek(offset)
+    shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+
 class FileHandler:
-    def __init__(self, upload_dir: str = "./uploads"):
+    __slots__ = (
+        "upload_dir", "image_dir", "audio_dir", "video_dir", "document_dir", "other_dir",
+        "supported_types", "_type_index", "_all_dirs", "_storage_paths", "_dirs_ready",
+        "_upload_dir_str", "_upload_root_resolved",
+        "_ext_mime_cache", "_stat_cache", "_negative_cache",
+    )
+    
+    def __init__(self, upload_dir: str = "./uploads") -> None:
         
         self.upload_dir = Path(upload_dir)
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
         
         
         self.image_dir = self.upload_dir / "images"
@@ -19,181 +138,383 @@ class FileHandler:
         self.other_dir = self.upload_dir / "other"
         
         
-        for dir_path in [self.image_dir, self.audio_dir, self.video_dir, self.document_dir, self.other_dir]:
-            dir_path.mkdir(exist_ok=True)
+        self._all_dirs = (self.image_dir, self.audio_dir, self.video_dir, self.document_dir, self.other_dir)
+        self._storage_paths = {
+            "image": self.image_dir,
+            "audio": self.audio_dir,
+            "video": self.video_dir,
+            "document": self.document_dir,
+            "other": self.other_dir
+        }
+        self._upload_dir_str = str(self.upload_dir)
+        self._upload_root_resolved = self.upload_dir.resolve()
+        
+        # 目录在首次上传时才创建
+        self._dirs_ready: bool = False
         
         
         self.supported_types = {
-            "image": ["image/jpeg", "image/png", "image/gif", "image/webp", "image/svg+xml"],
-            "audio": ["audio/mpeg", "audio/wav", "audio/ogg", "audio/flac"],
-            "video": ["video/mp4", "video/avi", "video/mov", "video/webm"],
-            "document": ["application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                         "text/plain", "text/csv", "application/json", "application/javascript"]
+            "image": frozenset(("image/jpeg", "image/png", "image/gif", "image/webp", "image/svg+xml")),
+            "audio": frozenset(("audio/mpeg", "audio/wav", "audio/ogg", "audio/flac")),
+            "video": frozenset(("video/mp4", "video/avi", "video/mov", "video/webm")),
+            "document": frozenset(("application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                                   "text/plain", "text/csv", "application/json", "application/javascript"))
         }
+        
+        # content_type -> file_type 反向索引
+        self._type_index = {ct: ft for ft, cts in self.supported_types.items() for ct in cts}
+        
+        # 扩展名 -> MIME类型缓存
+        self._ext_mime_cache: Dict[str, str] = {}
+        
+        # 请求路径 -> (过期时间, 文件路径, stat结果, 相对路径)；以及不存在路径的过期时间
+        self._stat_cache: "OrderedDict[str, Tuple[float, Path, os.stat_result, str]]" = OrderedDict()
+        self._negative_cache: Dict[str, float] = {}
     
     def _get_file_type(self, content_type: str) -> str:
         
-        for file_type, types in self.supported_types.items():
-            if content_type in types:
-                return file_type
-        return "other"
+        return self._type_index.get(content_type, "other")
     
     def _get_file_extension(self, content_type: str) -> str:
         
         ext = mimetypes.guess_extension(content_type)
         return ext if ext else ".bin"
     
+    def _mime_for(self, name: str) -> str:
+        
+        dot = name.rfind(".")
+        ext = name[dot:].lower() if dot != -1 else ""
+        content_type = self._ext_mime_cache.get(ext)
+        if content_type is None:
+            content_type = mimetypes.guess_type("x" + ext)[0] or "application/octet-stream"
+            self._ext_mime_cache[ext] = content_type
+        return content_type
+    
+    def _resolve_upload_path(self, file_path: str) -> Optional[Tuple[Path, Path]]:
+        
+        # 不以上传目录开头的相对路径视为相对于上传目录
+        path = Path(file_path)
+        if not path.is_absolute() and not str(path).startswith(self._upload_dir_str):
+            path = self.upload_dir / path
+        
+        # 按解析后的真实路径判断是否位于上传目录内，防止 ../ 越界及 uploads_evil 之类的前缀误判
+        resolved = path.resolve()
+        root = self._upload_root_resolved
+        if resolved != root and root not in resolved.parents:
+            return None
+        return path, resolved
+    
+    def _lookup_file(self, file_path: str) -> Optional[Tuple[Path, os.stat_result, str]]:
+        
+        # 带短期缓存的路径解析和stat，重复查询同一文件时无需系统调用；
+        # 返回 (文件路径, stat结果, 相对上传目录的路径)
+        now = time.monotonic()
+        cached = self._stat_cache.get(file_path)
+        if cached is not None:
+            if cached[0] > now:
+                # 其他线程可能在get之后清空或淘汰了该条目
+                try:
+                    self._stat_cache.move_to_end(file_path)
+                except KeyError:
+                    pass
+                return cached[1], cached[2], cached[3]
+            self._stat_cache.pop(file_path, None)
+        
+        missing_until = self._negative_cache.get(file_path)
+        if missing_until is not None:
+            if missing_until > now:
+                return None
+            self._negative_cache.pop(file_path, None)
+        
+        resolved_paths = self._resolve_upload_path(file_path)
+        st = _stat_regular_file(resolved_paths[0]) if resolved_paths is not None else None
+        if st is None:
+            if len(self._negative_cache) >= _STAT_CACHE_SIZE:
+                self._negative_cache.clear()
+            self._negative_cache[file_path] = now + _NEGATIVE_CACHE_TTL
+            return None
+        
+        path, resolved = resolved_paths
+        relative_path = os.path.relpath(resolved, self._upload_root_resolved)
+        self._stat_cache[file_path] = (now + _STAT_CACHE_TTL, path, st, relative_path)
+        if len(self._stat_cache) > _STAT_CACHE_SIZE:
+            try:
+                self._stat_cache.popitem(last=False)
+            except KeyError:
+                pass
+        return path, st, relative_path
+    
+    def _ensure_dirs(self) -> None:
+        
+        if self._dirs_ready:
+            return
+        for dir_path in self._all_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+        self._dirs_ready = True
+    
     def _get_storage_path(self, file_type: str) -> Path:
         
-        paths = {
-            "image": self.image_dir,
-            "audio": self.audio_dir,
-            "video": self.video_dir,
-            "document": self.document_dir,
-            "other": self.other_dir
-        }
-        return paths.get(file_type, self.other_dir)
+        return self._storage_paths.get(file_type, self.other_dir)
     
-    def upload_file(self, file: BinaryIO, content_type: str, filename: Optional[str] = None) -> Dict:
+    def upload_file(self, file: BinaryIO, content_type: str, filename: Optional[str] = None) -> Dict[str, Any]:
         
         
         file_type = self._get_file_type(content_type)
         
         
         file_ext = self._get_file_extension(content_type)
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
+        file_id = str(_fast_uuid4())
+        unique_filename = f"{file_id}{file_ext}"
         
         
-        storage_path = self._get_storage_path(file_type)
+        # 按UUID前两位分片存放，避免单个目录中的文件数无限增长
+        self._ensure_dirs()
+        category_dir = self._get_storage_path(file_type)
+        storage_path = category_dir / file_id[:2]
+        storage_path.mkdir(exist_ok=True)
         
         
         file_path = storage_path / unique_filename
         
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file, buffer)
+        try:
+            with open(file_path, "wb") as buffer:
+                _copy_stream(file, buffer)
+        except BaseException:
+            # 流式写入中途失败时不留下不完整的文件
+            file_path.unlink(missing_ok=True)
+            raise
+        
+        # 新文件可能曾被查询为不存在
+        self._negative_cache.clear()
         
+        st = os.stat(file_path)
         
         return {
-            "file_id": str(uuid.uuid4()),
+            "file_id": file_id,
             "filename": filename or unique_filename,
             "storage_filename": unique_filename,
             "file_type": file_type,
             "content_type": content_type,
-            "file_size": file_path.stat().st_size,
+            "file_size": st.st_size,
             "storage_path": str(file_path),
-            "relative_path": str(file_path.relative_to(self.upload_dir)),
-            "upload_time": file_path.stat().st_ctime
+            "relative_path": os.path.join(category_dir.name, file_id[:2], unique_filename),
+            "upload_time": st.st_ctime
         }
     
-    def download_file(self, file_path: str) -> Optional[Path]:
+    async def upload_file_async(self, file: BinaryIO, content_type: str, filename: Optional[str] = None) -> Dict[str, Any]:
         
+        # 磁盘写入在线程池中执行，不阻塞事件循环
+        return await asyncio.to_thread(self.upload_file, file, content_type, filename)
+    
+    def download_file(self, file_path: str) -> Optional[Path]:
         
-        if not file_path.startswith(str(self.upload_dir)):
-            file_path = self.upload_dir / file_path
         
-        file_path = Path(file_path)
+        found = self._lookup_file(file_path)
+        if found is not None:
+            return found[0]
         
+        return None
+    
+    def resolve_download(self, file_path: str) -> Optional[Tuple[Path, os.stat_result, str]]:
         
-        if file_path.exists() and file_path.is_file():
-            return file_path
+        # 返回 (路径, stat结果, MIME类型)，HTTP层可直接复用stat结果，无需再次stat
+        found = self._lookup_file(file_path)
+        if found is None:
+            return None
         
-        return None
+        path, st, _ = found
+        return path, st, self._mime_for(path.name)
+    
+    def open_for_sendfile(self, file_path: str) -> Optional[Tuple[int, int]]:
+        
+        # 返回 (只读文件描述符, 文件大小)，供HTTP层通过 os.sendfile / loop.sock_sendfile
+        # 直接从页缓存发送到套接字；描述符由调用方在发送完成后关闭
+        found = self._lookup_file(file_path)
+        if found is None:
+            return None
+        
+        try:
+            fd = os.open(found[0], os.O_RDONLY)
+        except OSError:
+            return None
+        
+        try:
+            return fd, os.fstat(fd).st_size
+        except OSError:
+            os.close(fd)
+            return None
     
     def delete_file(self, file_path: str) -> bool:
         
         
-        if not file_path.startswith(str(self.upload_dir)):
-            file_path = self.upload_dir / file_path
+        resolved_paths = self._resolve_upload_path(file_path)
+        if resolved_paths is None:
+            return False
+        file_path = resolved_paths[0]
         
-        file_path = Path(file_path)
         
-        
-        if file_path.exists() and file_path.is_file():
+        if _stat_regular_file(file_path) is not None:
             try:
                 file_path.unlink()
+                self._stat_cache.clear()
                 return True
             except Exception:
                 return False
         
         return False
     
-    def list_files(self, file_type: Optional[str] = None) -> List[Dict]:
-        
-        files = []
+    def _iter_category_entries(self, directory: Path) -> Iterator[Tuple[os.DirEntry, str]]:
+        
+        # 返回分类目录下的文件（包括分片子目录中的文件）及其相对上传目录的父目录
+        category = directory.name
+        shards = []
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            # 尚未上传过文件时目录还不存在
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry, category
+                elif entry.is_dir(follow_symlinks=False):
+                    shards.append(entry)
+        
+        for shard in shards:
+            parent = os.path.join(category, shard.name)
+            with os.scandir(shard.path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        yield entry, parent
+    
+    def iter_files(self, file_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         
         
         if file_type:
             target_dir = self._get_storage_path(file_type)
             directories = [target_dir]
         else:
-            directories = [self.image_dir, self.audio_dir, self.video_dir, self.document_dir, self.other_dir]
+            directories = self._all_dirs
         
         
         for directory in directories:
-            for file_path in directory.iterdir():
-                if file_path.is_file():
-                    
-                    content_type, _ = mimetypes.guess_type(str(file_path))
-                    
-                    files.append({
-                        "filename": file_path.name,
-                        "file_type": directory.name,
-                        "content_type": content_type or "application/octet-stream",
-                        "file_size": file_path.stat().st_size,
-                        "storage_path": str(file_path),
-                        "relative_path": str(file_path.relative_to(self.upload_dir)),
-                        "upload_time": file_path.stat().st_ctime,
-                        "last_modified": file_path.stat().st_mtime
-                    })
-        
-        
-        files.sort(key=lambda x: x["upload_time"], reverse=True)
-        
-        return files
+            for entry, parent in self._iter_category_entries(directory):
+                # DirEntry会缓存stat结果，每个文件只需一次stat
+                st = entry.stat()
+                
+                yield {
+                    "filename": entry.name,
+                    "file_type": directory.name,
+                    "content_type": self._mime_for(entry.name),
+                    "file_size": st.st_size,
+                    "storage_path": entry.path,
+                    "relative_path": os.path.join(parent, entry.name),
+                    "upload_time": st.st_ctime,
+                    "last_modified": st.st_mtime
+                }
     
-    def get_file_info(self, file_path: str) -> Optional[Dict]:
+    def list_files(self, file_type: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         
+        files = self.iter_files(file_type)
         
-        if not file_path.startswith(str(self.upload_dir)):
-            file_path = self.upload_dir / file_path
+        # 只需要最新的limit个文件时用堆选取，无需对全部文件排序
+        if limit is not None:
+            return heapq.nlargest(limit, files, key=_upload_time_key)
         
-        file_path = Path(file_path)
+        return sorted(files, key=_upload_time_key, reverse=True)
+    
+    def get_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
         
         
-        if file_path.exists() and file_path.is_file():
-            
-            content_type, _ = mimetypes.guess_type(str(file_path))
+        found = self._lookup_file(file_path)
+        if found is not None:
+            file_path, st, relative_path = found
+            storage_path = str(file_path)
             
             return {
                 "filename": file_path.name,
-                "file_type": file_path.parent.name,
-                "content_type": content_type or "application/octet-stream",
-                "file_size": file_path.stat().st_size,
-                "storage_path": str(file_path),
-                "relative_path": str(file_path.relative_to(self.upload_dir)),
-                "upload_time": file_path.stat().st_ctime,
-                "last_modified": file_path.stat().st_mtime
+                "file_type": relative_path.split(os.sep, 1)[0],
+                "content_type": self._mime_for(file_path.name),
+                "file_size": st.st_size,
+                "storage_path": storage_path,
+                "relative_path": relative_path,
+                "upload_time": st.st_ctime,
+                "last_modified": st.st_mtime
             }
         
         return None
     
-    def clean_old_files(self, days: int = 30) -> int:
+    def list_files_bulk(self, file_type: Optional[str] = None) -> Dict[str, List[Any]]:
+        
+        # 按列返回文件列表（每个字段一个列表，按上传时间倒序），
+        # 大量文件时比逐文件字典少得多的对象分配，且可直接JSON序列化
+        filenames: List[str] = []
+        file_types: List[str] = []
+        content_types: List[str] = []
+        sizes: List[int] = []
+        relative_paths: List[str] = []
+        ctimes: List[float] = []
+        mtimes: List[float] = []
+        
+        directories = [self._get_storage_path(file_type)] if file_type else self._all_dirs
+        for directory in directories:
+            category = directory.name
+            for entry, parent in self._iter_category_entries(directory):
+                st = entry.stat()
+                filenames.append(entry.name)
+                file_types.append(category)
+                content_types.append(self._mime_for(entry.name))
+                sizes.append(st.st_size)
+                relative_paths.append(os.path.join(parent, entry.name))
+                ctimes.append(st.st_ctime)
+                mtimes.append(st.st_mtime)
+        
+        # 只对下标排序一次，再按下标重排各列
+        order = sorted(range(len(ctimes)), key=ctimes.__getitem__, reverse=True)
+        columns = {
+            "filename": filenames,
+            "file_type": file_types,
+            "content_type": content_types,
+            "file_size": sizes,
+            "relative_path": relative_paths,
+            "upload_time": ctimes,
+            "last_modified": mtimes,
+        }
+        return {name: [column[i] for i in order] for name, column in columns.items()}
+    
+    async def list_files_async(self, file_type: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         
-        import time
+        return await asyncio.to_thread(self.list_files, file_type, limit)
+    
+    async def get_file_info_async(self, file_path: str) -> Optional[Dict[str, Any]]:
+        
+        return await asyncio.to_thread(self.get_file_info, file_path)
+    
+    def clean_old_files(self, days: int = 30) -> int:
         
-        deleted_count = 0
         cutoff_time = time.time() - (days * 86400)  
         
         
-        for directory in [self.image_dir, self.audio_dir, self.video_dir, self.document_dir, self.other_dir]:
-            for file_path in directory.iterdir():
-                if file_path.is_file() and file_path.stat().st_ctime < cutoff_time:
-                    try:
-                        file_path.unlink()
-                        deleted_count += 1
-                    except Exception:
-                        continue
+        # 先在一次scandir遍历中收集过期文件，遍历结束后再统一删除
+        expired = []
+        for directory in self._all_dirs:
+            expired.extend(
+                entry.path for entry, _ in self._iter_category_entries(directory)
+                if entry.stat().st_ctime < cutoff_time
+            )
+        
+        deleted_count = 0
+        unlink = os.unlink
+        for path in expired:
+            try:
+                unlink(path)
+                deleted_count += 1
+            except OSError:
+                continue
+        
+        if deleted_count:
+            self._stat_cache.clear()
         
         return deleted_count
 
@@ -2,25 +2,87 @@
 
 import sys
 import os
+import atexit
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 # 设置日志配置
-logging.basicConfig(level=logging.INFO, encoding='utf-8')
+# 日志记录先放入队列，由后台线程写到stderr，请求处理中不做同步写入
+log_queue = queue.SimpleQueue()
+log_queue_handler = QueueHandler(log_queue)
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+logging.basicConfig(level=logging.INFO, handlers=[log_queue_handler])
+log_listener = QueueListener(log_queue, log_stream_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File, Query, Request
-from fastapi.responses import JSONResponse, FileResponse
+import asyncio
+import shutil
+
+# io_uring 需要的最低内核版本
+_URING_MIN_KERNEL = (5, 11)
+
+def _kernel_version():
+    try:
+        release = os.uname().release.split('-', 1)[0]
+        return tuple(int(part) for part in release.split('.')[:2])
+    except (AttributeError, ValueError):
+        return (0, 0)
+
+def _install_event_loop_policy():
+    """按可用性安装事件循环策略：Linux 上优先 uringcore（io_uring），其次 uvloop"""
+    if sys.platform == 'linux' and _kernel_version() >= _URING_MIN_KERNEL:
+        try:
+            import uringcore
+            asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+            return 'uringcore'
+        except ImportError:
+            pass
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return 'uvloop'
+        except ImportError:
+            pass
+    return None
+
+# 必须在创建任何事件循环之前安装
+event_loop_policy = _install_event_loop_policy()
+if event_loop_policy:
+    logger.info('Using %s event loop policy', event_loop_policy)
+
+from fastapi import FastAPI, HTTPException, WebSocket, UploadFile, File, Query, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from fastapi.exceptions import RequestValidationError
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import json
-from api.realtime.websocket_manager import manager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 安装了orjson时所有JSON响应都用orjson序列化
+JSONResponseClass = ORJSONResponse if orjson is not None else JSONResponse
+from api.realtime.websocket_manager import manager, loads_message
 from api.file_handler.file_handler import file_handler
+from api.config_manager.config_manager import config_manager, ProxyConfig, WebSocketConfig
+from core.datastore import TTLCacheStrategy
 
 from core.node_registry import get_all_nodes, load_custom_nodes, _node_registry
+from core.ai_model_manager import get_ai_model_manager
 from core.video_processing_nodes import *  
 from core.wan22_nodes import *
 from core.hunyuan_video_nodes import *
@@ -44,8 +106,7 @@ async def initialize_modules():
         
         # 初始化插件系统
         plugin_dir = os.path.join(os.path.dirname(__file__), '../../plugins')
-        if not os.path.exists(plugin_dir):
-            os.makedirs(plugin_dir)
+        await asyncio.to_thread(os.makedirs, plugin_dir, exist_ok=True)
         plugin_manager.add_plugin_dir(plugin_dir)
         
         # 发现并加载插件
@@ -54,20 +115,21 @@ async def initialize_modules():
             await plugin_manager.activate_module(plugin_id)
         
         logger.info('All core modules activated successfully')
-        logger.info(f'Discovered {len(discovered_plugins)} plugins')
+        logger.info('Discovered %d plugins', len(discovered_plugins))
     except Exception as e:
-        logger.error(f'Failed to initialize modules: {e}')
+        logger.error('Failed to initialize modules: %s', e)
 
 import importlib
 
 # 模块API缓存
 workflow_module_api = None
 node_manager_api = None
+task_queue_module_api = None
 
 # 定义应用生命周期管理
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    global workflow_module_api, node_manager_api
+    global workflow_module_api, node_manager_api, task_queue_module_api
     
     # 初始化模块系统
     await initialize_modules()
@@ -75,16 +137,27 @@ async def lifespan(app: FastAPI):
     # 获取工作流模块API
     workflow_module_api = module_manager.get_module_api('workflow')
     
+    # 获取任务队列模块API，请求处理时直接复用
+    task_queue_module_api = module_manager.get_module_api('task_queue')
+    
     # 获取节点管理器插件API
     node_manager_api = module_manager.get_module_api('node_manager')
     
     # 获取并缓存插件索引
-    from core.module.plugin_manager import plugin_manager
     await plugin_manager.fetch_and_cache_index()
     
+    # 多worker部署时通过Redis在各进程间转发WebSocket广播和房间消息
+    redis_url = config_manager.get_model(WebSocketConfig).redis_url
+    if redis_url:
+        try:
+            await manager.start_backend(redis_url)
+        except Exception as e:
+            logger.error('Failed to connect WebSocket fan-out backend: %s', e)
+    
     yield
     
     # 清理资源
+    await manager.stop_backend()
     await module_manager.deactivate_module('workflow')
     if module_manager.get_module_state('node_manager') == 'activated':
         await module_manager.deactivate_module('node_manager')
@@ -94,7 +167,8 @@ app = FastAPI(
     title="Cognot AI API",
     description="AI 工作流引擎 API 接口，专注于 AI 绘图和 AI 视频处理",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=JSONResponseClass
 )
 
 # 配置CORS中间件
@@ -106,52 +180,91 @@ app.add_middleware(
     allow_headers=["*"],  # 允许所有HTTP头
 )
 
+# HTTP异常的错误响应同样使用默认的JSON响应类（FastAPI内置处理器固定使用标准库json）
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return JSONResponseClass(content={"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
 # 配置静态文件服务
 frontend_path = os.path.join(os.path.dirname(__file__), '../../frontend/dist')
+
+class CachedStaticFiles(StaticFiles):
+    """
+    启动时预先stat前端构建目录中的所有文件，请求时直接使用缓存的stat结果；
+    构建目录只在重新部署时变化，未命中缓存的路径仍走StaticFiles的默认查找
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stat_index: Dict[str, Tuple[str, os.stat_result]] = {}
+        self._immutable_dir = ""
+        if self.directory is None:
+            return
+        
+        root = os.path.realpath(self.directory)
+        # Vite输出到assets目录的文件名带内容哈希，可以长期缓存
+        self._immutable_dir = os.path.join(root, "assets") + os.sep
+        for dirpath, _, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root)
+            self._stat_index[rel_dir] = (dirpath, os.stat(dirpath))
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                self._stat_index[os.path.normpath(os.path.join(rel_dir, filename))] = (full_path, os.stat(full_path))
+    
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        cached = self._stat_index.get(os.path.normpath(path))
+        if cached is not None:
+            return cached
+        return super().lookup_path(path)
+    
+    async def get_response(self, path: str, scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            # 单页应用路由：不存在的GET路径回退到index.html，由前端路由处理
+            index = self._stat_index.get("index.html")
+            if exc.status_code != 404 or index is None or not self.html:
+                raise
+            return self.file_response(index[0], index[1], scope)
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if self._immutable_dir and str(full_path).startswith(self._immutable_dir):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 # 健康检查接口
+# 健康检查会被负载均衡器高频轮询，响应体在启动时序列化一次
+HEALTH_CHECK_BODY = b'{"status":"ok","message":"Cognot AI API is running"}'
+
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "message": "Cognot AI API is running"}
+    return Response(content=HEALTH_CHECK_BODY, media_type="application/json")
 
 # 模型管理接口
 @app.get("/models")
 async def get_available_models(model_type: str = None):
     """获取可用模型列表"""
-    from core.ai_model_manager import ai_model_manager
-    
-    if model_type:
-        models = ai_model_manager.get_available_models(model_type)
-    else:
-        models = []
-        # 获取所有类型的模型
-        for model_type in ai_model_manager.model_paths.keys():
-            models.extend(ai_model_manager.get_available_models(model_type))
-    
-    # 格式化返回结果
-    formatted_models = []
-    for model_path in models:
-        model_info = ai_model_manager.get_model_info(model_path)
-        formatted_models.append(model_info)
     
-    return {"models": formatted_models}
+    # 未指定类型时返回所有类型的模型，一次扫描同时得到模型信息
+    return {"models": get_ai_model_manager().get_models_info_bulk(model_type or None)}
 
 @app.get("/models/types")
 async def get_model_types():
     """获取可用模型类型"""
-    from core.ai_model_manager import ai_model_manager
-    return {"model_types": ['all'] + ai_model_manager.get_user_friendly_model_types()}
+    return {"model_types": ['all'] + get_ai_model_manager().get_user_friendly_model_types()}
 
 @app.post("/models/upload")
 async def upload_model(model_type: str, file: UploadFile = File(...)):
     """上传模型"""
-    from core.ai_model_manager import ai_model_manager
     
     try:
-        # 读取文件内容
-        content = await file.read()
-        
-        # 上传模型
-        success = ai_model_manager.upload_model(model_type, content, file.filename)
+        # 直接把上传的临时文件流交给模型管理器，在线程池中写盘，不阻塞事件循环
+        await file.seek(0)
+        success = await asyncio.to_thread(get_ai_model_manager().upload_model, model_type, file.file, file.filename)
         
         if success:
             return {"status": "ok", "message": f"Model uploaded successfully: {file.filename}"}
@@ -163,10 +276,9 @@ async def upload_model(model_type: str, file: UploadFile = File(...)):
 @app.delete("/models/delete")
 async def delete_model(model_path: str = Query(...)):
     """删除模型"""
-    from core.ai_model_manager import ai_model_manager
     
     try:
-        success = ai_model_manager.delete_model(model_path)
+        success = await asyncio.to_thread(get_ai_model_manager().delete_model, model_path)
         
         if success:
             return {"status": "ok", "message": f"Model deleted successfully: {model_path}"}
@@ -175,49 +287,65 @@ async def delete_model(model_path: str = Query(...)):
     except Exception as e:
         return {"status": "error", "message": f"Delete failed: {str(e)}"}
 
-nodes_metadata_cache = None
+# 节点元数据响应缓存：{缓存键: (注册表版本, 序列化后的JSON)}，注册表版本变化时重新序列化
+nodes_payload_cache: Dict[str, Tuple[int, bytes]] = {}
+
+def _dumps_json(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+
+def _cached_nodes_response(cache_key: str, version: int, build: Callable[[], Any]) -> Response:
+    cached = nodes_payload_cache.get(cache_key)
+    if cached is None or cached[0] != version:
+        cached = (version, _dumps_json(build()))
+        nodes_payload_cache[cache_key] = cached
+    return Response(content=cached[1], media_type="application/json")
+
+# 可选节点只需加载一次，之后的请求直接跳过导入
+sd_nodes_loaded = False
+third_party_ai_nodes_loaded = False
 
 @app.get("/nodes")
 async def get_nodes(load_sd: bool = False, load_third_party_ai: bool = False):
     
-    global nodes_metadata_cache
+    global sd_nodes_loaded, third_party_ai_nodes_loaded
     
-    if load_sd:
+    if load_sd and not sd_nodes_loaded:
         try:
             importlib.import_module('core.stable_diffusion_nodes')
-            nodes_metadata_cache = None
+            sd_nodes_loaded = True
+            nodes_payload_cache.pop('nodes', None)
         except ImportError:
             pass
     
-    if load_third_party_ai:
+    if load_third_party_ai and not third_party_ai_nodes_loaded:
         try:
             # 通过插件系统加载第三方AI节点
-            from core.plugin_manager import plugin_manager
             node_manager_api = plugin_manager.get_module_api('node_manager')
             if node_manager_api:
                 node_manager_api.load_third_party_ai_nodes()
-                nodes_metadata_cache = None
+                third_party_ai_nodes_loaded = True
+                nodes_payload_cache.pop('nodes', None)
             else:
-                print("Failed to load third-party AI nodes: Node manager plugin not activated")
+                logger.warning("Failed to load third-party AI nodes: Node manager plugin not activated")
         except Exception as e:
-            print(f"Failed to load third-party AI nodes: {e}")
+            logger.warning("Failed to load third-party AI nodes: %s", e)
     
-    if nodes_metadata_cache is not None:
-        return nodes_metadata_cache
-    
-    # 通过插件系统获取所有节点
+    # 通过插件系统获取所有节点，注册表未变化时直接返回已序列化的结果
     try:
-        from core.plugin_manager import plugin_manager
         node_manager_api = plugin_manager.get_module_api('node_manager')
         if node_manager_api:
-            nodes_metadata = node_manager_api.get_all_nodes()
-            nodes_metadata_cache = nodes_metadata
-            return nodes_metadata
+            return _cached_nodes_response(
+                'nodes',
+                node_manager_api["get_registry_version"](),
+                node_manager_api["get_all_nodes"]
+            )
         else:
-            print("Warning: Node manager plugin not activated, returning empty nodes list")
+            logger.warning("Node manager plugin not activated, returning empty nodes list")
             return []
     except Exception as e:
-        print(f"Failed to get nodes from plugin system: {e}")
+        logger.warning("Failed to get nodes from plugin system: %s", e)
         return []
 
 @app.post("/nodes/load")
@@ -225,7 +353,6 @@ async def load_nodes(module_path: str):
     
     try:
         # 通过插件系统加载自定义节点
-        from core.plugin_manager import plugin_manager
         node_manager_api = plugin_manager.get_module_api('node_manager')
         if node_manager_api:
             node_manager_api.load_custom_nodes(module_path)
@@ -235,7 +362,8 @@ async def load_nodes(module_path: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-workflow_executions = {}
+# 本地执行状态缓存：限制条目数并在一小时后过期，避免长时间运行时无限增长
+workflow_executions = TTLCacheStrategy(capacity=10000, ttl=3600)
 
 workflows = []
 
@@ -274,11 +402,8 @@ async def validate_workflow(workflow_def: WorkflowDefinition):
     验证工作流中使用的节点是否都已安装
     """
     try:
-        workflow_data = workflow_def.dict()
-        
-        # 使用节点注册表验证工作流
-        from core.node_registry import _node_registry
-        missing_nodes = _node_registry.validate_workflow(workflow_data)
+        # 校验只需要节点列表，无需把整个模型转换为字典
+        missing_nodes = _node_registry.validate_workflow({"nodes": workflow_def.nodes})
         
         if missing_nodes:
             return {
@@ -302,8 +427,7 @@ async def get_nodes_metadata():
     """
     获取所有已注册节点的元数据
     """
-    from core.node_registry import _node_registry
-    return _node_registry.get_all_nodes()
+    return _cached_nodes_response('metadata', _node_registry.get_version(), _node_registry.get_all_nodes)
 
 @app.post("/api/workflow/validate")
 async def validate_workflow_api(workflow: Dict[str, Any]):
@@ -316,9 +440,6 @@ async def validate_workflow_api(workflow: Dict[str, Any]):
     Returns:
         JSON响应，包含验证结果和缺失的节点列表
     """
-    from core.node_registry import _node_registry
-    from core.module.plugin_manager import plugin_manager
-    
     # 验证节点
     missing_nodes = _node_registry.validate_workflow(workflow)
     
@@ -331,6 +452,9 @@ async def validate_workflow_api(workflow: Dict[str, Any]):
         "missing_nodes_plugins": missing_nodes_plugins
     }
 
+# 一键安装缺失节点时同时进行的插件安装数上限（仅git克隆并行，pip依赖安装在插件管理器中串行执行）
+MAX_CONCURRENT_PLUGIN_INSTALLS = 4
+
 @app.post("/api/plugins/install_missing_nodes")
 async def install_missing_nodes(request: Request):
     """
@@ -342,9 +466,6 @@ async def install_missing_nodes(request: Request):
     Returns:
         JSON响应，包含安装结果
     """
-    from core.node_registry import _node_registry
-    from core.module.plugin_manager import plugin_manager
-    
     try:
         # 获取工作流数据
         workflow = await request.json()
@@ -359,10 +480,24 @@ async def install_missing_nodes(request: Request):
         if not missing_nodes_plugins:
             return {"status": "error", "message": "No plugins found for missing nodes"}
         
-        # 安装所有缺失的插件
+        # 并发安装所有缺失的插件；多个节点可能来自同一插件，每个插件只安装一次
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PLUGIN_INSTALLS)
+        
+        async def install(git_url: str):
+            async with semaphore:
+                return await plugin_manager.install_plugin(git_url)
+        
+        git_urls = list(dict.fromkeys(missing_nodes_plugins.values()))
+        outcomes = await asyncio.gather(*(install(url) for url in git_urls), return_exceptions=True)
+        install_outcomes = {}
+        for git_url, outcome in zip(git_urls, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = (False, str(outcome))
+            install_outcomes[git_url] = outcome
+        
         results = []
         for node_type, git_url in missing_nodes_plugins.items():
-            success, error_msg = await plugin_manager.install_plugin(git_url)
+            success, error_msg = install_outcomes[git_url]
             results.append({
                 "node_type": node_type,
                 "git_url": git_url,
@@ -382,7 +517,7 @@ async def install_missing_nodes(request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error installing missing nodes plugins: {e}")
+        logger.error("Error installing missing nodes plugins: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/plugins/list_available")
@@ -390,7 +525,6 @@ async def list_available_plugins():
     """
     获取所有已知且可安装的外部插件列表
     """
-    from core.module.plugin_manager import plugin_manager
     plugins_dict = plugin_manager.get_available_plugins()
     # 将字典转换为数组格式，前端期望数组
     return list(plugins_dict.values())
@@ -409,7 +543,6 @@ async def install_plugin(request: PluginInstallRequest):
     Returns:
         安装结果
     """
-    from core.module.plugin_manager import plugin_manager
     success, error_msg = await plugin_manager.install_plugin(request.git_url)
     
     if success:
@@ -431,8 +564,6 @@ async def find_plugin_by_node_id(node_id: str = Query(...)):
     Returns:
         插件的Git URL，如果找不到则返回404
     """
-    from core.module.plugin_manager import plugin_manager
-    
     # 确保索引已加载
     if not await plugin_manager.ensure_index_loaded():
         raise HTTPException(status_code=500, detail="Failed to load plugin index")
@@ -454,74 +585,35 @@ def get_custom_repositories():
     """
     获取用户自定义的仓库地址列表
     """
-    from core.module.plugin_manager import plugin_manager
-    
     return {
         "custom_repositories": plugin_manager.get_custom_repositories(),
         "disabled_repositories": plugin_manager.get_disabled_repositories()
     }
 
-@app.post("/api/plugins/custom_repositories")
-async def add_custom_repository(request: Request):
-    """
-    添加自定义仓库地址
-    
-    Returns:
-        添加成功返回status: ok，失败返回status: error
-    """
-    from core.module.plugin_manager import plugin_manager
-    
-    try:
-        data = await request.json()
-        repo_url = data.get("repo_url")
-        if not repo_url:
-            raise HTTPException(status_code=400, detail="repo_url is required")
-        
-        if plugin_manager.add_custom_repository(repo_url):
-            return {"status": "ok", "message": f"Repository added successfully: {repo_url}"}
-        else:
-            return {"status": "error", "message": f"Failed to add repository: {repo_url}"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error adding custom repository: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+# 仓库管理操作表：操作名 -> (插件管理器方法, 消息中的动词, 过去分词, 日志描述)
+REPOSITORY_OPERATIONS = {
+    "add": (plugin_manager.add_custom_repository, "add", "added", "adding custom repository"),
+    "remove": (plugin_manager.remove_custom_repository, "remove", "removed", "removing custom repository"),
+    "disable": (plugin_manager.disable_repository, "disable", "disabled", "disabling repository"),
+    "enable": (plugin_manager.enable_repository, "enable", "enabled", "enabling repository"),
+}
 
-@app.delete("/api/plugins/custom_repositories")
-async def remove_custom_repository(request: Request):
+@app.post("/api/plugins/repositories/{op}")
+async def manage_repository(op: str, request: Request):
     """
-    删除自定义仓库地址
+    添加、删除、禁用或启用仓库地址
     
-    Returns:
-        删除成功返回status: ok，失败返回status: error
-    """
-    from core.module.plugin_manager import plugin_manager
-    
-    try:
-        data = await request.json()
-        repo_url = data.get("repo_url")
-        if not repo_url:
-            raise HTTPException(status_code=400, detail="repo_url is required")
+    Args:
+        op: 操作名，add/remove/disable/enable
+        request: 包含repo_url的请求体
         
-        if plugin_manager.remove_custom_repository(repo_url):
-            return {"status": "ok", "message": f"Repository removed successfully: {repo_url}"}
-        else:
-            return {"status": "error", "message": f"Failed to remove repository: {repo_url}"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error removing custom repository: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.post("/api/plugins/disable_repository")
-async def disable_repository(request: Request):
-    """
-    禁用指定的仓库地址
-    
     Returns:
-        禁用成功返回status: ok，失败返回status: error
+        操作成功返回status: ok，失败返回status: error
     """
-    from core.module.plugin_manager import plugin_manager
+    operation = REPOSITORY_OPERATIONS.get(op)
+    if operation is None:
+        raise HTTPException(status_code=404, detail=f"Unknown repository operation: {op}")
+    handler, verb, past, action = operation
     
     try:
         data = await request.json()
@@ -529,43 +621,32 @@ async def disable_repository(request: Request):
         if not repo_url:
             raise HTTPException(status_code=400, detail="repo_url is required")
         
-        if plugin_manager.disable_repository(repo_url):
-            return {"status": "ok", "message": f"Repository disabled successfully: {repo_url}"}
+        if handler(repo_url):
+            return {"status": "ok", "message": f"Repository {past} successfully: {repo_url}"}
         else:
-            return {"status": "error", "message": f"Failed to disable repository: {repo_url}"}
+            return {"status": "error", "message": f"Failed to {verb} repository: {repo_url}"}
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error disabling repository: {e}")
+        logger.error("Error %s: %s", action, e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/plugins/enable_repository")
-async def enable_repository(request: Request):
-    """
-    启用指定的仓库地址
-    
-    Returns:
-        启用成功返回status: ok，失败返回status: error
-    """
-    from core.module.plugin_manager import plugin_manager
-    
-    try:
-        data = await request.json()
-        repo_url = data.get("repo_url")
-        if not repo_url:
-            raise HTTPException(status_code=400, detail="repo_url is required")
-        
-        if plugin_manager.enable_repository(repo_url):
-            return {"status": "ok", "message": f"Repository enabled successfully: {repo_url}"}
-        else:
-            return {"status": "error", "message": f"Failed to enable repository: {repo_url}"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error enabling repository: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+def _repository_operation_endpoint(op: str):
+    async def endpoint(request: Request):
+        return await manage_repository(op, request)
+    endpoint.__name__ = f"{op}_repository"
+    return endpoint
+
+# 兼容旧的仓库管理接口路径
+for _path, _method, _op in (
+    ("/api/plugins/custom_repositories", "POST", "add"),
+    ("/api/plugins/custom_repositories", "DELETE", "remove"),
+    ("/api/plugins/disable_repository", "POST", "disable"),
+    ("/api/plugins/enable_repository", "POST", "enable"),
+):
+    app.add_api_route(_path, _repository_operation_endpoint(_op), methods=[_method])
 
-@app.post("/api/plugins/restart_required")
+@app.api_route("/api/plugins/restart_required", methods=["GET", "POST"])
 async def check_restart_required():
     """
     检查是否需要重启服务
@@ -573,34 +654,53 @@ async def check_restart_required():
     Returns:
         是否需要重启服务
     """
-    from core.module.plugin_manager import plugin_manager
     restart_required = plugin_manager.restart_required()
     
     return {
         "restart_required": restart_required
     }
 
-@app.post("/workflows/execute", response_model=ExecutionResponse)
-async def submit_workflow(
-    workflow_def: WorkflowDefinition,
-):
+# 工作流定义的校验器只构建一次，提交工作流时直接从原始请求体校验JSON
+WORKFLOW_DEF_ADAPTER = TypeAdapter(WorkflowDefinition)
+
+@app.post(
+    "/workflows/execute",
+    response_model=ExecutionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": WorkflowDefinition.model_json_schema()}}
+        }
+    }
+)
+async def submit_workflow(request: Request):
     # 处理工作流执行请求
     # 使用任务队列模块API将工作流推送到后台执行
     
-    workflow_data = workflow_def.dict()
+    # 跳过FastAPI的参数解析，由pydantic直接校验原始JSON
+    try:
+        workflow_def = WORKFLOW_DEF_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # 与FastAPI自身的请求体校验错误保持相同格式
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+    
+    # 任务队列需要普通字典；模型没有嵌套子模型，校验后的字段值已是普通的list/dict，
+    # 浅层转换即可得到与model_dump相同的结果，省去一次深拷贝
+    workflow_data = dict(workflow_def)
     
-    # 获取任务队列模块API
-    task_queue_module_api = module_manager.get_module_api('task_queue')
+    # 使用启动时缓存的任务队列模块API
     if not task_queue_module_api:
         raise HTTPException(status_code=503, detail="Task queue module not available")
     
     execution_id = await task_queue_module_api.enqueue_workflow(workflow_data)
     
-    workflow_executions[execution_id] = {
+    workflow_executions.set(execution_id, {
         "status": "pending",
         "results": None,
         "error": None
-    }
+    })
     
     return {
         "execution_id": execution_id,
@@ -612,24 +712,24 @@ async def submit_workflow(
 async def get_execution_status(execution_id: str):
     
     try:
-        # 从任务队列模块API获取任务状态
-        task_queue_module_api = module_manager.get_module_api('task_queue')
+        # 使用启动时缓存的任务队列模块API
         if not task_queue_module_api:
             raise HTTPException(status_code=503, detail="Task queue module not available")
         
         job_status = task_queue_module_api.get_job_status(execution_id)
         
         # 更新本地执行状态缓存
-        if execution_id in workflow_executions:
-            workflow_executions[execution_id]["status"] = job_status["status"]
-            workflow_executions[execution_id]["results"] = job_status["result"]
-            workflow_executions[execution_id]["error"] = job_status["error"]
+        execution = workflow_executions.get(execution_id)
+        if execution is not None:
+            execution["status"] = job_status["status"]
+            execution["results"] = job_status["result"]
+            execution["error"] = job_status["error"]
         else:
-            workflow_executions[execution_id] = {
+            workflow_executions.set(execution_id, {
                 "status": job_status["status"],
                 "results": job_status["result"],
                 "error": job_status["error"]
-            }
+            })
         
         return {
             "execution_id": execution_id,
@@ -638,12 +738,11 @@ async def get_execution_status(execution_id: str):
             "error": job_status["error"]
         }
     except Exception as e:
-        logger.error(f"Error getting job status: {e}")
-        if execution_id not in workflow_executions:
-            raise HTTPException(status_code=404, detail="Execution ID not found")
-        
+        logger.error("Error getting job status: %s", e)
         # 如果任务队列不可用，返回本地缓存的状态
-        execution = workflow_executions[execution_id]
+        execution = workflow_executions.get(execution_id)
+        if execution is None:
+            raise HTTPException(status_code=404, detail="Execution ID not found")
         return {
             "execution_id": execution_id,
             "status": execution["status"],
@@ -655,8 +754,7 @@ async def get_execution_status(execution_id: str):
 async def download_results(execution_id: str):
     
     try:
-        # 从任务队列模块获取结果
-        task_queue_module_api = module_manager.get_module_api('task_queue')
+        # 使用启动时缓存的任务队列模块API
         if not task_queue_module_api:
             raise HTTPException(status_code=503, detail="Task queue module not available")
         
@@ -665,33 +763,37 @@ async def download_results(execution_id: str):
         if job_status["status"] != "finished":
             raise HTTPException(status_code=400, detail="Execution is not completed yet")
         
-        return JSONResponse(content=job_status["result"])
+        return JSONResponseClass(content=job_status["result"])
     except Exception as e:
-        logger.error(f"Error getting job results: {e}")
+        logger.error("Error getting job results: %s", e)
         
         # 如果任务队列不可用，尝试从本地缓存获取
-        if execution_id not in workflow_executions:
+        execution = workflow_executions.get(execution_id)
+        if execution is None:
             raise HTTPException(status_code=404, detail="Execution ID not found")
         
-        execution = workflow_executions[execution_id]
         if execution["status"] != "completed":
             raise HTTPException(status_code=400, detail="Execution is not completed yet")
         
-        return JSONResponse(content=execution["results"])
+        return JSONResponseClass(content=execution["results"])
+
+# 上传流分块写盘的缓冲区大小
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+def _save_upload_stream(src, path: str):
+    """将上传流分块写入磁盘（在线程池中调用）"""
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(src, f, _UPLOAD_CHUNK_SIZE)
 
 # 文件上传接口 - 保留用于AI视频和AI绘图功能
 @app.post("/api/files/upload")
 async def upload_file(file: UploadFile = File(...)):
     
     try:
-        # 读取文件内容
-        contents = await file.read()
+        # 直接把上传的临时文件流交给file_handler，不在内存中整体缓冲
+        await file.seek(0)
         
-        # 将文件指针重置到开头
-        import io
-        file.file = io.BytesIO(contents)
-        
-        file_info = file_handler.upload_file(
+        file_info = await file_handler.upload_file_async(
             file.file,
             file.content_type,
             file.filename
@@ -704,9 +806,11 @@ async def upload_file(file: UploadFile = File(...)):
 @app.get("/api/files/download/{file_path:path}")
 async def download_file(file_path: str):
     
-    file = file_handler.download_file(file_path)
-    if file:
-        return FileResponse(file, filename=file.name)
+    # 复用file_handler缓存的stat结果，FileResponse不再重复stat，文件体由服务器通过sendfile发送
+    target = file_handler.resolve_download(file_path)
+    if target:
+        path, st, media_type = target
+        return FileResponse(str(path), filename=path.name, media_type=media_type, stat_result=st)
     raise HTTPException(status_code=404, detail="File not found")
 
 # 插件管理接口
@@ -716,33 +820,10 @@ async def get_plugins():
     获取所有插件信息
     """
     try:
-        plugins = []
-        for plugin_id in plugin_manager.get_activated_modules():
-            plugin_instance = plugin_manager._modules.get(plugin_id)
-            if plugin_instance and plugin_instance.module:
-                metadata = plugin_instance.module.metadata
-                plugins.append({
-                    "id": metadata.id,
-                    "name": metadata.name,
-                    "version": metadata.version,
-                    "description": metadata.description,
-                    "status": plugin_instance.state.value
-                })
-        return JSONResponse(content={"plugins": plugins})
-    except Exception as e:
-        logger.error(f"Error getting plugins: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.get("/api/plugins/restart_required")
-async def check_restart_required():
-    """
-    检查是否需要重启
-    """
-    try:
-        return JSONResponse(content={"restart_required": False})
+        # 插件列表在插件管理器中预先序列化，插件状态变化时才重新生成
+        return Response(content=plugin_manager.get_plugins_listing(), media_type="application/json")
     except Exception as e:
-        logger.error(f"Error checking restart required: {e}")
+        logger.error("Error getting plugins: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/plugins/upload")
@@ -757,9 +838,8 @@ async def upload_plugin(plugin_file: UploadFile = File(...)):
         
         # 保存插件文件
         plugin_path = os.path.join(temp_dir, plugin_file.filename)
-        with open(plugin_path, 'wb') as f:
-            content = await plugin_file.read()
-            f.write(content)
+        await plugin_file.seek(0)
+        await asyncio.to_thread(_save_upload_stream, plugin_file.file, plugin_path)
         
         # 加载插件
         plugin_id = await plugin_manager.load_plugin(plugin_path)
@@ -767,9 +847,9 @@ async def upload_plugin(plugin_file: UploadFile = File(...)):
             os.remove(plugin_path)
             raise HTTPException(status_code=400, detail="Failed to load plugin")
         
-        return JSONResponse(content={"status": "ok", "plugin_id": plugin_id})
+        return JSONResponseClass(content={"status": "ok", "plugin_id": plugin_id})
     except Exception as e:
-        logger.error(f"Error uploading plugin: {e}")
+        logger.error("Error uploading plugin: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/plugins/{plugin_id}")
@@ -779,11 +859,11 @@ async def delete_plugin(plugin_id: str):
     """
     try:
         if await plugin_manager.unload_plugin(plugin_id):
-            return JSONResponse(content={"status": "ok"})
+            return JSONResponseClass(content={"status": "ok"})
         else:
             raise HTTPException(status_code=404, detail="Plugin not found")
     except Exception as e:
-        logger.error(f"Error deleting plugin: {e}")
+        logger.error("Error deleting plugin: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # 环境检测和工具安装接口
@@ -794,9 +874,9 @@ async def check_environment():
     """
     try:
         environment_status = plugin_manager.check_environment()
-        return JSONResponse(content={"status": "success", "environment": environment_status})
+        return JSONResponseClass(content={"status": "success", "environment": environment_status})
     except Exception as e:
-        logger.error(f"Error checking environment: {e}")
+        logger.error("Error checking environment: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/environment/install/{tool_name}")
@@ -808,19 +888,19 @@ async def install_tool(tool_name: str):
         if tool_name == "git":
             success, error_msg = plugin_manager.install_git()
             if success:
-                return JSONResponse(content={"status": "success", "message": "Git安装成功"})
+                return JSONResponseClass(content={"status": "success", "message": "Git安装成功"})
             else:
                 raise HTTPException(status_code=400, detail=error_msg)
         elif tool_name == "python_packages":
             # 安装Python依赖包
             result = await plugin_manager.install_python_packages()
-            return JSONResponse(content=result)
+            return JSONResponseClass(content=result)
         else:
             raise HTTPException(status_code=400, detail=f"工具 {tool_name} 不支持通过此API安装")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"安装工具 {tool_name} 时出错: {e}")
+        logger.error("安装工具 %s 时出错: %s", tool_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # 节点管理接口
@@ -833,11 +913,11 @@ async def get_node_repos():
         if not node_manager_api:
             raise HTTPException(status_code=500, detail="Node manager plugin not activated")
         repos = node_manager_api["get_third_party_repos"]()
-        return JSONResponse(content={"repos": repos})
+        return JSONResponseClass(content={"repos": repos})
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting node repos: {e}")
+        logger.error("Error getting node repos: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/node-manager/repos")
@@ -849,11 +929,11 @@ async def add_node_repo(repo: Dict[str, Any]):
         if not node_manager_api:
             raise HTTPException(status_code=500, detail="Node manager plugin not activated")
         node_manager_api["add_third_party_repo"](repo)
-        return JSONResponse(content={"status": "ok", "message": "Repository added successfully"})
+        return JSONResponseClass(content={"status": "ok", "message": "Repository added successfully"})
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error adding node repo: {e}")
+        logger.error("Error adding node repo: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/node-manager/repos")
@@ -865,11 +945,11 @@ async def remove_node_repo(repo_url: str = Query(...)):
         if not node_manager_api:
             raise HTTPException(status_code=500, detail="Node manager plugin not activated")
         node_manager_api["remove_third_party_repo"](repo_url)
-        return JSONResponse(content={"status": "ok", "message": "Repository removed successfully"})
+        return JSONResponseClass(content={"status": "ok", "message": "Repository removed successfully"})
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error removing node repo: {e}")
+        logger.error("Error removing node repo: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/node-manager/install")
@@ -881,11 +961,11 @@ async def install_nodes(repo_url: str = Query(...)):
         if not node_manager_api:
             raise HTTPException(status_code=500, detail="Node manager plugin not activated")
         result = node_manager_api["install_third_party_nodes"](repo_url)
-        return JSONResponse(content=result)
+        return JSONResponseClass(content=result)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error installing nodes: {e}")
+        logger.error("Error installing nodes: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/node-manager/uninstall")
@@ -897,11 +977,11 @@ async def uninstall_nodes(repo_name: str = Query(...)):
         if not node_manager_api:
             raise HTTPException(status_code=500, detail="Node manager plugin not activated")
         result = node_manager_api["uninstall_third_party_nodes"](repo_name)
-        return JSONResponse(content=result)
+        return JSONResponseClass(content=result)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error uninstalling nodes: {e}")
+        logger.error("Error uninstalling nodes: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/node-manager/third-party-nodes")
@@ -912,15 +992,15 @@ async def get_third_party_nodes():
     try:
         if not node_manager_api:
             raise HTTPException(status_code=500, detail="Node manager plugin not activated")
-        # 获取所有节点
-        all_nodes = node_manager_api["get_all_nodes"]()
-        
         # 过滤出第三方节点（这里简化处理，实际可以在节点元数据中添加来源信息）
-        third_party_nodes = all_nodes
-        
-        return JSONResponse(content={"nodes": third_party_nodes})
+        # 与/nodes共用序列化缓存，注册表未变化时直接返回已序列化的结果
+        return _cached_nodes_response(
+            'third_party_nodes',
+            node_manager_api["get_registry_version"](),
+            lambda: {"nodes": node_manager_api["get_all_nodes"]()}
+        )
     except Exception as e:
-        logger.error(f"Error getting third-party nodes: {e}")
+        logger.error("Error getting third-party nodes: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/plugins/{plugin_id}/reload")
@@ -931,11 +1011,11 @@ async def reload_plugin(plugin_id: str):
     try:
         new_plugin_id = await plugin_manager.reload_plugin(plugin_id)
         if new_plugin_id:
-            return JSONResponse(content={"status": "ok", "plugin_id": new_plugin_id})
+            return JSONResponseClass(content={"status": "ok", "plugin_id": new_plugin_id})
         else:
             raise HTTPException(status_code=404, detail="Plugin not found")
     except Exception as e:
-        logger.error(f"Error reloading plugin: {e}")
+        logger.error("Error reloading plugin: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # WebSocket接口 - 用于实时更新工作流状态
@@ -945,10 +1025,10 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
     await manager.connect(websocket, client_id)
     
     try:
-        while True:
+        # iter_text在客户端断开时正常结束循环，无需捕获WebSocketDisconnect
+        async for data in websocket.iter_text():
             
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            message = loads_message(data)
             message_type = message.get("type")
             
             if message_type == "workflow_update":
@@ -956,53 +1036,62 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 workflow_data = message.get("workflow")
                 room_id = message.get("room_id")
                 
+                # 工作流更新是完整的状态快照，慢客户端只需收到每个房间最新的一条
                 if room_id:
                     await manager.send_room_message(
                         room_id, 
-                        {"type": "workflow_update", "client_id": client_id, "workflow": workflow_data}
+                        {"type": "workflow_update", "client_id": client_id, "workflow": workflow_data},
+                        coalesce_key=f"workflow_update:{room_id}"
                     )
                 else:
                     await manager.broadcast(
                         {"type": "workflow_update", "client_id": client_id, "workflow": workflow_data}, 
-                        exclude_client_id=client_id
+                        exclude_client_id=client_id,
+                        coalesce_key="workflow_update"
                     )
     
-    except WebSocketDisconnect:
-        manager.disconnect(client_id)
-    except Exception as e:
-        print(f"WebSocket error for client {client_id}: {e}")
-        manager.disconnect(client_id)
+    except Exception:
+        logger.exception("WebSocket error for client %s", client_id)
+    finally:
+        manager.disconnect(client_id, websocket)
 
 # 队列信息接口
 @app.get("/queue/info")
 async def get_queue_info():
     """获取队列信息"""
     try:
-        # 从任务队列模块获取队列信息
-        task_queue_module_api = module_manager.get_module_api('task_queue')
+        # 使用启动时缓存的任务队列模块API
         if not task_queue_module_api:
             raise HTTPException(status_code=503, detail="Task queue module not available")
         
         queue_info = task_queue_module_api.get_queue_info()
-        return JSONResponse(content=queue_info)
+        return JSONResponseClass(content=queue_info)
     except Exception as e:
-        logger.error(f"Error getting queue info: {e}")
+        logger.error("Error getting queue info: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# 运行指标接口：只读取各组件维护的计数器，适合被监控系统高频抓取
+@app.get("/metrics")
+async def get_metrics():
+    """获取WebSocket连接和任务队列的运行指标"""
+    return JSONResponseClass(content={
+        "websocket": manager.get_stats(),
+        "queue": task_queue_module_api.get_queue_info() if task_queue_module_api else None
+    })
+
 # 队列任务列表接口
 @app.get("/queue/tasks")
 async def get_queue_tasks():
     """获取队列任务列表"""
     try:
-        # 从任务队列模块获取任务列表
-        task_queue_module_api = module_manager.get_module_api('task_queue')
+        # 使用启动时缓存的任务队列模块API
         if not task_queue_module_api:
             raise HTTPException(status_code=503, detail="Task queue module not available")
         
         queue_tasks = task_queue_module_api.get_queue_tasks()
-        return JSONResponse(content=queue_tasks)
+        return JSONResponseClass(content=queue_tasks)
     except Exception as e:
-        logger.error(f"Error getting queue tasks: {e}")
+        logger.error("Error getting queue tasks: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # 代理配置接口
@@ -1011,9 +1100,8 @@ async def get_proxy_config():
     """
     获取代理配置
     """
-    from api.config_manager.config_manager import config_manager
     proxy_config = config_manager.get("proxy", {})
-    return JSONResponse(content=proxy_config)
+    return JSONResponseClass(content=proxy_config)
 
 @app.post("/api/proxy/config")
 async def set_proxy_config(config: dict):
@@ -1021,22 +1109,19 @@ async def set_proxy_config(config: dict):
     设置代理配置
     """
     try:
-        from api.config_manager.config_manager import config_manager
-        from api.config_manager.config_manager import ProxyConfig
-        
         # 验证配置
-        proxy_config = ProxyConfig(**config)
+        proxy_config = ProxyConfig.model_validate(config)
         
-        # 更新配置
-        for key, value in proxy_config.dict().items():
+        # 更新配置（字段均为基本类型，直接迭代模型即可，无需model_dump）
+        for key, value in proxy_config:
             config_manager.set(f"proxy.{key}", value)
         
         # 保存配置到文件
         config_manager.save_config_file("app")
         
-        return JSONResponse(content={"status": "success", "message": "Proxy configuration updated successfully"})
+        return JSONResponseClass(content={"status": "success", "message": "Proxy configuration updated successfully"})
     except Exception as e:
-        logger.error(f"Error setting proxy config: {e}")
+        logger.error("Error setting proxy config: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 def run_server(host: str = "0.0.0.0", port: int = 8000):
@@ -1044,7 +1129,15 @@ def run_server(host: str = "0.0.0.0", port: int = 8000):
     Run the Cognot API server
     """
     import uvicorn
-    uvicorn.run(app, host=host, port=port)
+    # 已安装自定义事件循环策略时，避免uvicorn用自己的loop设置覆盖它
+    # 推送的工作流更新是可压缩的JSON，由配置决定是否协商permessage-deflate
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        loop="none" if event_loop_policy else "auto",
+        ws_per_message_deflate=config_manager.get_model(WebSocketConfig).per_message_deflate
+    )
 
 if __name__ == "__main__":
     logger.info("Starting server...")
@@ -1052,12 +1145,5 @@ if __name__ == "__main__":
 
 # 挂载前端静态文件（放在所有API路由之后）
 if os.path.exists(frontend_path):
-    app.mount("/", StaticFiles(directory=frontend_path, html=True), name="frontend")
-
-@app.get("/{full_path:path}")
-async def catch_all(full_path: str):
-    """捕获所有请求，重定向到index.html（单页应用路由）"""
-    index_path = os.path.join(frontend_path, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
-    return JSONResponse(status_code=404, content={"detail": "Page not found"})
+    app.mount("/", CachedStaticFiles(directory=frontend_path, html=True), name="frontend")
+
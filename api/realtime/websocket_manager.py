@@ -1,6 +1,75 @@
 import json
+import asyncio
+import logging
+from collections import deque
 from fastapi import WebSocket
-from typing import Dict, List, Optional
+from typing import Any, Dict, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps_message(message: Dict) -> str:
+    if orjson is not None:
+        # 仍以文本帧发送，保持与现有客户端的兼容
+        return orjson.dumps(message).decode('utf-8')
+    return json.dumps(message)
+
+def loads_message(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 广播时每批投递的连接数，批与批之间让出事件循环
+BROADCAST_BATCH_SIZE = 50
+# 每个客户端待发送消息队列的容量
+OUTBOUND_QUEUE_SIZE = 256
+
+# 多worker部署时通过Redis发布/订阅转发广播和房间消息的频道
+BROADCAST_CHANNEL = "ws:broadcast"
+ROOM_CHANNEL_PREFIX = "ws:room:"
+
+class OutboundQueue(asyncio.Queue):
+    """
+    客户端发送队列：容量满时丢弃最旧的消息；带合并键的消息（如工作流状态快照）
+    在队列中只保留最新的一条，新消息直接替换尚未发送的旧消息
+    """
+    
+    def _init(self, maxsize):
+        self._queue = deque()
+        # 合并键 -> 尚未发送的最新payload
+        self._pending: Dict[str, str] = {}
+    
+    def _put(self, item):
+        self._queue.append(item)
+    
+    def _get(self):
+        coalesce_key, payload = self._queue.popleft()
+        if coalesce_key is not None:
+            return self._pending.pop(coalesce_key)
+        return payload
+    
+    def offer(self, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        # 返回是否有消息因队列已满而被丢弃
+        if coalesce_key is not None and coalesce_key in self._pending:
+            self._pending[coalesce_key] = payload
+            return False
+        
+        dropped = self.full()
+        if dropped:
+            # 丢弃最旧的消息，保证慢客户端占用的内存有上限
+            self.get_nowait()
+        
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = payload
+            self.put_nowait((coalesce_key, None))
+        else:
+            self.put_nowait((None, payload))
+        return dropped
 
 class ConnectionManager:
     def __init__(self):
@@ -9,12 +78,120 @@ class ConnectionManager:
         
         self.user_rooms: Dict[str, str] = {}
         
-        self.room_connections: Dict[str, List[str]] = {}
+        self.room_connections: Dict[str, Set[str]] = {}
+        
+        # 每个客户端一个发送队列和一个写任务，慢客户端不会阻塞广播方
+        self.out_queues: Dict[str, OutboundQueue] = {}
+        
+        self.writers: Dict[str, asyncio.Task] = {}
+        
+        # 可选的Redis发布/订阅后端，未启用时消息只在本进程内分发
+        self._redis = None
+        
+        self._pubsub = None
+        
+        self._listener: Optional[asyncio.Task] = None
+        
+        self._background_tasks: Set[asyncio.Task] = set()
+        
+        # 运行计数器，在各自的代码路径上累加，读取统计时无需遍历连接
+        self.total_connections = 0
+        
+        self.messages_dropped = 0
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "active_connections": len(self.active_connections),
+            "occupied_rooms": len(self.room_connections),
+            "total_connections": self.total_connections,
+            "messages_dropped": self.messages_dropped
+        }
+    
+    async def start_backend(self, redis_url: str):
+        # redis为可选依赖，只有配置了Redis地址时才导入
+        import redis.asyncio as aioredis
+        
+        client = aioredis.from_url(redis_url, decode_responses=True)
+        pubsub = client.pubsub()
+        # 始终订阅广播频道，各房间频道在本进程有成员时才订阅
+        await pubsub.subscribe(BROADCAST_CHANNEL, *(ROOM_CHANNEL_PREFIX + room_id for room_id in self.room_connections))
+        
+        # 订阅成功后才切换到Redis分发，连接失败时继续使用进程内分发
+        self._redis = client
+        self._pubsub = pubsub
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("WebSocket fan-out backend connected: %s", redis_url)
+    
+    async def stop_backend(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+    
+    async def _listen(self):
+        try:
+            async for item in self._pubsub.listen():
+                if item["type"] != "message":
+                    continue
+                
+                # 消息格式: {"x": 排除的客户端ID, "k": 合并键, "p": 已序列化的消息}
+                envelope = loads_message(item["data"])
+                payload = envelope["p"]
+                exclude_client_id = envelope.get("x")
+                coalesce_key = envelope.get("k")
+                channel = item["channel"]
+                if channel == BROADCAST_CHANNEL:
+                    await self._deliver_broadcast(payload, exclude_client_id, coalesce_key)
+                elif channel.startswith(ROOM_CHANNEL_PREFIX):
+                    await self._deliver_room(channel[len(ROOM_CHANNEL_PREFIX):], payload, exclude_client_id, coalesce_key)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("WebSocket fan-out backend listener stopped")
+    
+    def _remove_from_room(self, client_id: str, room_id: str):
+        members = self.room_connections.get(room_id)
+        if members is None:
+            return
+        
+        members.discard(client_id)
+        if not members:
+            del self.room_connections[room_id]
+            # 本进程不再有该房间的成员，取消订阅对应的频道
+            if self._pubsub is not None:
+                task = asyncio.create_task(self._unsubscribe_room(room_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+    
+    async def _unsubscribe_room(self, room_id: str):
+        # 期间可能有新成员加入，此时保留订阅
+        if room_id not in self.room_connections and self._pubsub is not None:
+            await self._pubsub.unsubscribe(ROOM_CHANNEL_PREFIX + room_id)
     
     async def connect(self, websocket: WebSocket, client_id: str, room_id: Optional[str] = None):
         await websocket.accept()
         
+        previous = self.active_connections.get(client_id)
+        if previous is not None:
+            # 同一客户端ID重复连接时由新连接接管：先停止旧连接的写任务并关闭旧连接，
+            # 旧连接的处理协程随后调用disconnect时会因连接不匹配而被忽略
+            self.disconnect(client_id)
+            try:
+                await previous.close()
+            except Exception:
+                pass
+        
         self.active_connections[client_id] = websocket
+        self.total_connections += 1
+        self.out_queues[client_id] = OutboundQueue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.writers[client_id] = asyncio.create_task(
+            self._drain(client_id, websocket, self.out_queues[client_id])
+        )
         
         
         if room_id:
@@ -26,26 +203,66 @@ class ConnectionManager:
             {"type": "connection_success", "message": "Connected to WebSocket server"}
         )
     
-    def disconnect(self, client_id: str):
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        
+        # 指定websocket时只移除该连接，该客户端ID已被新连接接管时不做任何处理
+        if websocket is not None and self.active_connections.get(client_id) is not websocket:
+            return
         
         if client_id in self.user_rooms:
-            room_id = self.user_rooms[client_id]
-            if room_id in self.room_connections:
-                self.room_connections[room_id].remove(client_id)
+            self._remove_from_room(client_id, self.user_rooms[client_id])
             del self.user_rooms[client_id]
         
         
         if client_id in self.active_connections:
             del self.active_connections[client_id]
+        
+        self.out_queues.pop(client_id, None)
+        writer = self.writers.pop(client_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+    
+    async def _drain(self, client_id: str, websocket: WebSocket, queue: OutboundQueue):
+        try:
+            while True:
+                payload = await queue.get()
+                await websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 发送失败说明连接已失效，直接移除该客户端
+            self.disconnect(client_id, websocket)
     
     async def send_personal_message(self, client_id: str, message: Dict):
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_text(json.dumps(message))
+        queue = self.out_queues.get(client_id)
+        if queue is not None:
+            if queue.offer(dumps_message(message)):
+                self.messages_dropped += 1
+    
+    async def broadcast(self, message: Dict, exclude_client_id: Optional[str] = None, coalesce_key: Optional[str] = None):
+        if self._redis is not None:
+            # 发布到Redis，由各worker（包括本进程）的订阅任务投递给本地连接
+            await self._publish(BROADCAST_CHANNEL, dumps_message(message), exclude_client_id, coalesce_key)
+            return
+        
+        if not self.out_queues:
+            return
+        
+        # 消息只序列化一次，所有连接共用同一份payload
+        await self._deliver_broadcast(dumps_message(message), exclude_client_id, coalesce_key)
     
-    async def broadcast(self, message: Dict, exclude_client_id: Optional[str] = None):
-        for client_id, connection in self.active_connections.items():
-            if client_id != exclude_client_id:
-                await connection.send_text(json.dumps(message))
+    async def _deliver_broadcast(self, payload: str, exclude_client_id: Optional[str], coalesce_key: Optional[str] = None):
+        # 先对当前连接做一次快照，分批投递期间的连接/断开不影响本次广播
+        targets = tuple(
+            queue
+            for client_id, queue in self.out_queues.items()
+            if client_id != exclude_client_id
+        )
+        await self._fan_out(targets, payload, coalesce_key)
+    
+    async def _publish(self, channel: str, payload: str, exclude_client_id: Optional[str], coalesce_key: Optional[str] = None):
+        # 客户端ID和合并键来自客户端输入，使用结构化的信封而非分隔符拼接，避免其中的特殊字符破坏消息
+        await self._redis.publish(channel, dumps_message({"x": exclude_client_id, "k": coalesce_key, "p": payload}))
     
     async def join_room(self, client_id: str, room_id: str):
         
@@ -55,10 +272,11 @@ class ConnectionManager:
         
         self.user_rooms[client_id] = room_id
         if room_id not in self.room_connections:
-            self.room_connections[room_id] = []
+            self.room_connections[room_id] = set()
+            if self._pubsub is not None:
+                await self._pubsub.subscribe(ROOM_CHANNEL_PREFIX + room_id)
         
-        if client_id not in self.room_connections[room_id]:
-            self.room_connections[room_id].append(client_id)
+        self.room_connections[room_id].add(client_id)
         
         
         await self.send_room_message(
@@ -72,12 +290,7 @@ class ConnectionManager:
             return
         
         room_id = self.user_rooms[client_id]
-        if room_id in self.room_connections:
-            self.room_connections[room_id].remove(client_id)
-            
-            
-            if not self.room_connections[room_id]:
-                del self.room_connections[room_id]
+        self._remove_from_room(client_id, room_id)
         
         del self.user_rooms[client_id]
         
@@ -87,12 +300,37 @@ class ConnectionManager:
             {"type": "user_left", "client_id": client_id}
         )
     
-    async def send_room_message(self, room_id: str, message: Dict, exclude_client_id: Optional[str] = None):
+    async def send_room_message(self, room_id: str, message: Dict, exclude_client_id: Optional[str] = None, coalesce_key: Optional[str] = None):
+        if self._redis is not None:
+            # 房间成员可能分布在多个worker上，即使本进程没有成员也需要发布
+            await self._publish(ROOM_CHANNEL_PREFIX + room_id, dumps_message(message), exclude_client_id, coalesce_key)
+            return
+        
         if room_id not in self.room_connections:
             return
         
-        for client_id in self.room_connections[room_id]:
-            if client_id != exclude_client_id:
-                await self.send_personal_message(client_id, message)
+        await self._deliver_room(room_id, dumps_message(message), exclude_client_id, coalesce_key)
+    
+    async def _deliver_room(self, room_id: str, payload: str, exclude_client_id: Optional[str], coalesce_key: Optional[str] = None):
+        members = self.room_connections.get(room_id)
+        if not members:
+            return
+        
+        targets = tuple(
+            self.out_queues[client_id]
+            for client_id in members
+            if client_id != exclude_client_id and client_id in self.out_queues
+        )
+        await self._fan_out(targets, payload, coalesce_key)
+    
+    async def _fan_out(self, targets: Tuple[OutboundQueue, ...], payload: str, coalesce_key: Optional[str] = None):
+        # 只投递到各客户端的发送队列，实际发送由各自的写任务完成
+        for i in range(0, len(targets), BROADCAST_BATCH_SIZE):
+            for queue in targets[i:i + BROADCAST_BATCH_SIZE]:
+                if queue.offer(payload, coalesce_key):
+                    self.messages_dropped += 1
+            # 连接数较多时分批投递，避免单次广播长时间占用事件循环
+            if i + BROADCAST_BATCH_SIZE < len(targets):
+                await asyncio.sleep(0)
 
 manager = ConnectionManager()
@@ -0,0 +1,12 @@
+from typing import Any
+
+def fast_clone(value: Any) -> Any:
+    """
+    深拷贝JSON结构的数据（dict/list/基本类型），比copy.deepcopy更快
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return {k: fast_clone(v) for k, v in value.items()}
+    if value_type is list:
+        return [fast_clone(v) for v in value]
+    return value
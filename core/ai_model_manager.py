@@ -1,10 +1,34 @@
 import os
+import re
+import copy
+import shutil
 import yaml
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+try:
+    # LibYAML的C实现解析速度远快于纯Python实现，不可用时回退
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 logger = logging.getLogger(__name__)
 
+# 支持的模型文件扩展名
+MODEL_EXTENSIONS = frozenset({'.ckpt', '.safetensors', '.pt', '.pth'})
+# str.endswith接受元组，扫描目录时用它做扩展名检查，避免splitext和lower的字符串分配
+_EXT_TUPLE = tuple(MODEL_EXTENSIONS)
+
+# 匹配多行路径配置中的一行（去掉首尾空白，跳过空行）
+_PATH_LINE_RE = re.compile(r'\S(?:[^\n]*\S)?')
+
+# 模型配置解析缓存: 绝对路径 -> (st_mtime_ns, st_size, 解析结果)，文件变化时重新解析
+_YAML_CACHE: "OrderedDict[str, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+_YAML_CACHE_SIZE = 100
+
 class AIModelManager:
     """AI模型管理器"""
     
@@ -24,6 +48,22 @@ class AIModelManager:
             'upscale': 'upscale_models',      # 添加超分辨率模型
             'hunyuan_video': 'hunyuan_video'  # 添加HunyuanVideo模型
         }
+        # 内部模型类型 -> 用户友好类型（同一内部类型取映射中第一个友好名称）
+        self._internal_to_friendly: Dict[str, str] = {}
+        for friendly_type, internal_type in self.model_type_mapping.items():
+            self._internal_to_friendly.setdefault(internal_type, friendly_type)
+        # (规范化的目录前缀, 用户友好类型)，按前缀长度降序排列，优先匹配最具体的目录；
+        # 前缀以路径分隔符结尾，避免 /a/foo 误匹配 /a/foobar 下的文件
+        self._path_prefix_index: List[Tuple[str, str]] = sorted(
+            ((os.path.normpath(path) + os.sep, self._internal_to_friendly.get(model_type, model_type))
+             for model_type, paths in self.model_paths.items() for path in paths),
+            key=lambda item: -len(item[0])
+        )
+        self._managed_prefixes: Tuple[str, ...] = tuple(prefix for prefix, _ in self._path_prefix_index)
+        # 模型目录在初始化后不再变化，按路径缓存推断出的模型类型
+        self._cached_model_type = lru_cache(maxsize=4096)(self._get_model_type_from_path)
+        # 目录列表缓存: 规范化目录路径 -> (目录st_mtime_ns, [(文件路径, 文件名)])
+        self._listing_cache: Dict[str, Tuple[int, List[Tuple[str, str]]]] = {}
     
     def _load_model_config(self) -> Dict[str, Dict[str, str]]:
         """加载模型配置"""
@@ -33,13 +73,31 @@ class AIModelManager:
         ]
         
         for config_path in config_paths:
-            if os.path.exists(config_path):
-                try:
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        return yaml.safe_load(f) or {}
-                except yaml.YAMLError as e:
-                    logger.error(f"Failed to parse model config: {config_path}, Error: {e}")
-                    return {}
+            # 一次stat同时完成存在性检查和缓存校验
+            try:
+                st = os.stat(config_path)
+            except OSError:
+                continue
+            
+            cache_key = os.path.abspath(config_path)
+            cached = _YAML_CACHE.get(cache_key)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                _YAML_CACHE.move_to_end(cache_key)
+                # 返回副本，调用方修改配置不会影响缓存
+                return copy.deepcopy(cached[2])
+            
+            try:
+                with open(config_path, 'rb') as f:
+                    config = yaml.load(f, Loader=_YamlLoader) or {}
+            except yaml.YAMLError as e:
+                logger.error(f"Failed to parse model config: {config_path}, Error: {e}")
+                return {}
+            
+            _YAML_CACHE[cache_key] = (st.st_mtime_ns, st.st_size, config)
+            _YAML_CACHE.move_to_end(cache_key)
+            if len(_YAML_CACHE) > _YAML_CACHE_SIZE:
+                _YAML_CACHE.popitem(last=False)
+            return copy.deepcopy(config)
         
         logger.warning("No model config found, using default paths")
         return {}
@@ -50,16 +108,17 @@ class AIModelManager:
         uploads_path = os.path.join(os.path.dirname(__file__), "..", "uploads", "models")
         uploads_path = os.path.abspath(uploads_path)
         
-        default_paths = {
-            'checkpoints': [os.path.join(uploads_path, "checkpoints")],
-            'text_encoders': [os.path.join(uploads_path, "text_encoders")],
-            'clip_vision': [os.path.join(uploads_path, "clip_vision")],
-            'controlnet': [os.path.join(uploads_path, "controlnet")],
-            'loras': [os.path.join(uploads_path, "loras")],
-            'vae': [os.path.join(uploads_path, "vae")],
-            'embeddings': [os.path.join(uploads_path, "embeddings")],
-            'upscale_models': [os.path.join(uploads_path, "upscale_models")],
-            'hunyuan_video': [os.path.join(uploads_path, "hunyuan_video")]  # 添加HunyuanVideo模型路径
+        # 每种类型用dict保存路径（值为None），按插入顺序去重，成员检查为O(1)
+        default_paths: Dict[str, Dict[str, None]] = {
+            'checkpoints': dict.fromkeys([os.path.join(uploads_path, "checkpoints")]),
+            'text_encoders': dict.fromkeys([os.path.join(uploads_path, "text_encoders")]),
+            'clip_vision': dict.fromkeys([os.path.join(uploads_path, "clip_vision")]),
+            'controlnet': dict.fromkeys([os.path.join(uploads_path, "controlnet")]),
+            'loras': dict.fromkeys([os.path.join(uploads_path, "loras")]),
+            'vae': dict.fromkeys([os.path.join(uploads_path, "vae")]),
+            'embeddings': dict.fromkeys([os.path.join(uploads_path, "embeddings")]),
+            'upscale_models': dict.fromkeys([os.path.join(uploads_path, "upscale_models")]),
+            'hunyuan_video': dict.fromkeys([os.path.join(uploads_path, "hunyuan_video")])  # 添加HunyuanVideo模型路径
         }
         
         # 从配置文件中加载自定义路径
@@ -70,24 +129,20 @@ class AIModelManager:
                     if model_type == 'base_path' or model_type == 'is_default':
                         continue
                     
-                    if model_type not in default_paths:
-                        default_paths[model_type] = []
-                    
                     if isinstance(path, str):
-                        # 处理多行路径字符串
-                        paths = [p.strip() for p in path.split('\n') if p.strip()]
-                        for p in paths:
-                            full_path = os.path.join(base_path, p)
-                            if full_path not in default_paths[model_type]:
-                                default_paths[model_type].append(full_path)
+                        # 处理多行路径字符串，每行去掉首尾空白，忽略空行
+                        paths = _PATH_LINE_RE.findall(path)
                     elif isinstance(path, list):
                         # 处理路径列表
-                        for p in path:
-                            full_path = os.path.join(base_path, p)
-                            if full_path not in default_paths[model_type]:
-                                default_paths[model_type].append(full_path)
+                        paths = path
+                    else:
+                        continue
+                    
+                    type_paths = default_paths.setdefault(model_type, {})
+                    for p in paths:
+                        type_paths[os.path.join(base_path, p)] = None
         
-        return default_paths
+        return {model_type: list(paths) for model_type, paths in default_paths.items()}
     
     def get_available_models(self, model_type: str) -> List[str]:
         """获取指定类型的可用模型列表
@@ -106,22 +161,63 @@ class AIModelManager:
             return []
         
         available_models = []
-        supported_extensions = {'.ckpt', '.safetensors', '.pt', '.pth'}
-        
         for path in self.model_paths[model_type]:
-            if os.path.exists(path):
-                try:
-                    for filename in os.listdir(path):
-                        file_path = os.path.join(path, filename)
-                        if os.path.isfile(file_path):
-                            ext = os.path.splitext(filename)[1].lower()
-                            if ext in supported_extensions:
-                                available_models.append(file_path)
-                except Exception as e:
-                    logger.error(f"Failed to list models in {path}: {e}")
+            available_models.extend(item[0] for item in self._scan_model_dir(path))
         
         return available_models
     
+    def _scan_model_dir(self, path: str) -> List[Tuple[str, str]]:
+        """列出模型目录中的模型文件，目录修改时间未变时直接返回上次的列表
+        
+        缓存只包含文件列表：文件原地改写或仍在写入时不会更新目录的mtime，
+        因此大小和修改时间不缓存，由调用方按需stat。
+        
+        Args:
+            path: 模型目录路径
+            
+        Returns:
+            (文件路径, 文件名) 列表，调用方不应修改
+        """
+        key = os.path.normpath(path)
+        try:
+            # 目录中增删文件会更新目录的mtime，一次stat即可判断缓存是否有效
+            dir_mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self._listing_cache.pop(key, None)
+            return []
+        except OSError as e:
+            logger.error(f"Failed to list models in {path}: {e}")
+            return []
+        
+        cached = self._listing_cache.get(key)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+        
+        models = []
+        try:
+            # scandir返回的DirEntry自带文件类型信息，并缓存stat结果
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # 文件名多为小写，先直接匹配，失败时再转小写重试
+                    if not (name.endswith(_EXT_TUPLE) or name.lower().endswith(_EXT_TUPLE)):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    models.append((entry.path, name))
+        except FileNotFoundError:
+            self._listing_cache.pop(key, None)
+            return []
+        except Exception as e:
+            logger.error(f"Failed to list models in {path}: {e}")
+            return []
+        
+        self._listing_cache[key] = (dir_mtime, models)
+        return models
+    
     def get_model_info(self, model_path: str) -> Dict[str, str]:
         """获取模型信息
         
@@ -132,25 +228,66 @@ class AIModelManager:
             模型信息字典
         """
         filename = os.path.basename(model_path)
-        model_type = self._get_model_type_from_path(model_path)
+        model_type = self._cached_model_type(model_path)
+        
+        # 一次stat同时完成存在性检查、大小和修改时间的获取
+        try:
+            st = os.stat(model_path)
+            size, mtime = st.st_size, st.st_mtime
+        except OSError:
+            size, mtime = 0, 0.0
         
         return {
             'path': model_path,
             'name': filename,
             'type': model_type,
-            'size': os.path.getsize(model_path) if os.path.exists(model_path) else 0
+            'size': size,
+            'mtime': mtime
         }
     
+    def get_models_info_bulk(self, model_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """批量获取模型信息，复用目录列表缓存，大小和修改时间取自每个文件的最新stat
+        
+        Args:
+            model_type: 模型类型，为None时返回所有类型的模型
+            
+        Returns:
+            模型信息字典列表，格式与get_model_info相同
+        """
+        if model_type is None:
+            model_types = list(self.model_paths.keys())
+        else:
+            model_type = self.model_type_mapping.get(model_type, model_type)
+            if model_type not in self.model_paths:
+                return []
+            model_types = [model_type]
+        
+        models = []
+        for internal_type in model_types:
+            type_name = self._internal_to_friendly.get(internal_type, internal_type)
+            for path in self.model_paths[internal_type]:
+                for file_path, name in self._scan_model_dir(path):
+                    # 每次重新stat，正在写入或被原地覆盖的文件也能报告最新的大小和修改时间
+                    try:
+                        st = os.stat(file_path)
+                    except OSError:
+                        continue
+                    models.append({
+                        'path': file_path,
+                        'name': name,
+                        'type': type_name,
+                        'size': st.st_size,
+                        'mtime': st.st_mtime
+                    })
+        
+        return models
+    
     def _get_model_type_from_path(self, model_path: str) -> str:
         """从路径推断模型类型"""
-        for model_type, paths in self.model_paths.items():
-            for path in paths:
-                if model_path.startswith(path):
-                    # 将内部模型类型转换为用户友好的类型
-                    for friendly_type, internal_type in self.model_type_mapping.items():
-                        if model_type == internal_type:
-                            return friendly_type
-                    return model_type
+        model_path = os.path.normpath(model_path)
+        for prefix, friendly_type in self._path_prefix_index:
+            if model_path.startswith(prefix):
+                return friendly_type
         return 'unknown'
     
     def get_user_friendly_model_types(self) -> List[str]:
@@ -161,12 +298,12 @@ class AIModelManager:
         """
         return list(self.model_type_mapping.keys())
     
-    def upload_model(self, model_type: str, file_content: bytes, filename: str) -> bool:
+    def upload_model(self, model_type: str, file_content: Union[bytes, BinaryIO], filename: str) -> bool:
         """上传模型到指定类型的目录
         
         Args:
             model_type: 模型类型
-            file_content: 模型文件内容
+            file_content: 模型文件内容，或可读取的文件对象（分块写入，不整体读入内存）
             filename: 模型文件名
             
         Returns:
@@ -195,12 +332,23 @@ class AIModelManager:
         file_path = os.path.join(upload_path, filename)
         try:
             with open(file_path, 'wb') as f:
-                f.write(file_content)
+                if isinstance(file_content, (bytes, bytearray, memoryview)):
+                    f.write(file_content)
+                else:
+                    shutil.copyfileobj(file_content, f, 1 << 20)
             logger.info(f"Model uploaded successfully: {file_path}")
             return True
         except Exception as e:
             logger.error(f"Failed to save model file: {file_path}, Error: {e}")
+            # 分块写入中途失败时删除不完整的文件，避免被当作可用模型列出
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
             return False
+        finally:
+            # 覆盖同名文件不会改变目录mtime，写入期间的扫描结果也可能记录了不完整的大小
+            self._listing_cache.pop(os.path.normpath(upload_path), None)
     
     def delete_model(self, model_path: str) -> bool:
         """删除指定路径的模型
@@ -215,17 +363,8 @@ class AIModelManager:
             logger.error(f"Model not found: {model_path}")
             return False
         
-        # 验证模型路径是否在管理范围内
-        is_managed = False
-        for paths in self.model_paths.values():
-            for path in paths:
-                if model_path.startswith(path):
-                    is_managed = True
-                    break
-            if is_managed:
-                break
-        
-        if not is_managed:
+        # 验证模型路径是否在管理范围内（规范化后再比较，不能通过 .. 跳出模型目录）
+        if not os.path.normpath(model_path).startswith(self._managed_prefixes):
             logger.error(f"Model path is not managed by AIModelManager: {model_path}")
             return False
         
@@ -236,12 +375,30 @@ class AIModelManager:
         except Exception as e:
             logger.error(f"Failed to delete model: {model_path}, Error: {e}")
             return False
+        finally:
+            self._listing_cache.pop(os.path.dirname(os.path.normpath(model_path)), None)
 
-# 创建全局实例
+# 全局实例在首次使用时创建，导入本模块时不扫描模型目录
 ai_system_path = "f:\goting\Cognot\AI-System-master\AI-System-master"
 if not os.path.exists(ai_system_path):
     # 如果路径不存在，尝试使用相对路径
     ai_system_path = os.path.join(os.path.dirname(__file__), "..", "AI-System-master", "AI-System-master")
     ai_system_path = os.path.abspath(ai_system_path)
 
-ai_model_manager = AIModelManager(ai_system_path)
+_ai_model_manager: Optional[AIModelManager] = None
+_ai_model_manager_lock = threading.Lock()
+
+def get_ai_model_manager() -> AIModelManager:
+    """获取全局模型管理器实例，首次调用时创建"""
+    global _ai_model_manager
+    if _ai_model_manager is None:
+        with _ai_model_manager_lock:
+            if _ai_model_manager is None:
+                _ai_model_manager = AIModelManager(ai_system_path)
+    return _ai_model_manager
+
+def __getattr__(name: str) -> Any:
+    # 兼容 `from core.ai_model_manager import ai_model_manager`
+    if name == "ai_model_manager":
+        return get_ai_model_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
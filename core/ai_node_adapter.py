@@ -9,12 +9,45 @@ from .node_registry import register_node
 AI_NODE_PATH = "f:\goting\Cognot\AI-Nodes-master\AI-Nodes-master"
 sys.path.insert(0, AI_NODE_PATH)
 
+class AINodeAdapterWrapper(BaseNode):
+    """AI节点适配器类，将单个AI节点包装为Cognot节点"""
+    
+    def __init__(self, node_class, function_name: str, node_name: str):
+        super().__init__()
+        self.node_name = node_name
+        self.ai_node_instance = node_class()
+        # 节点函数在构造时解析一次，调用时不再getattr
+        self._fn = getattr(self.ai_node_instance, function_name)
+    
+    def __call__(self, **kwargs):
+        """调用AI节点"""
+        try:
+            # 调用AI节点的函数
+            result = self._fn(**kwargs)
+            
+            # 转换结果格式
+            if isinstance(result, tuple):
+                return {f"output_{i+1}": value for i, value in enumerate(result)}
+            else:
+                return {"output_1": result}
+        except Exception as e:
+            print(f"Error calling AI node {self.node_name}: {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
 class AINodeAdapter:
     """AI节点适配器，将AI节点转换为Cognot节点格式"""
     
     def __init__(self):
         self.ai_nodes = {}
-        self.load_ai_nodes()
+        # AI节点在首次转换时才加载，创建适配器本身不导入AI节点模块
+        self._ai_nodes_loaded = False
+    
+    def _ensure_ai_nodes_loaded(self):
+        if not self._ai_nodes_loaded:
+            self._ai_nodes_loaded = True
+            self.load_ai_nodes()
     
     def load_ai_nodes(self):
         """加载AI节点"""
@@ -70,6 +103,7 @@ class AINodeAdapter:
     
     def create_cognot_node_from_ai(self, node_name: str):
         """将AI节点转换为Cognot节点"""
+        self._ensure_ai_nodes_loaded()
         if node_name not in self.ai_nodes:
             print(f"AI node {node_name} not found")
             return None
@@ -114,38 +148,20 @@ class AINodeAdapter:
             # 创建节点类别
             category = getattr(node_class, "CATEGORY", "ai")
             
-            # 创建适配器类，将AI节点包装为Cognot节点
-            class AINodeAdapterWrapper(BaseNode):
-                """AI节点适配器类"""
-                
-                def __init__(self):
-                    super().__init__()
-                    self.ai_node_instance = node_class()
-                    
-                def __call__(self, **kwargs):
-                    """调用AI节点"""
-                    try:
-                        # 调用AI节点的函数
-                        result = getattr(self.ai_node_instance, function_name)(**kwargs)
-                        
-                        # 转换结果格式
-                        if isinstance(result, tuple):
-                            return {f"output_{i+1}": value for i, value in enumerate(result)}
-                        else:
-                            return {"output_1": result}
-                    except Exception as e:
-                        print(f"Error calling AI node {node_name}: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        raise
+            # 所有AI节点共用同一个适配器类，执行时按节点参数创建实例
+            def run_ai_node(**kwargs):
+                return AINodeAdapterWrapper(node_class, function_name, node_name)(**kwargs)
             
             # 注册到Cognot节点注册表
             register_node(
+                run_ai_node,
                 name=node_name,
                 description=description,
+                inputs=cognot_inputs,
+                outputs=cognot_outputs,
                 category=category,
                 icon="ai"
-            )(AINodeAdapterWrapper)
+            )
             
             print(f"Successfully converted AI node: {display_name} -> {node_name}")
             return True
@@ -158,6 +174,7 @@ class AINodeAdapter:
     
     def convert_all_nodes(self):
         """转换所有AI节点"""
+        self._ensure_ai_nodes_loaded()
         success_count = 0
         total_count = len(self.ai_nodes)
         
@@ -168,5 +185,5 @@ class AINodeAdapter:
         print(f"Conversion complete: {success_count}/{total_count} nodes converted successfully")
         return success_count
 
-# 创建全局适配器实例
+# 创建全局适配器实例（AI节点延迟到首次转换时加载）
 ai_node_adapter = AINodeAdapter()
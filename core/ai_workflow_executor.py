@@ -2,7 +2,7 @@ import sys
 import os
 import json
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # 添加AI工作流系统路径
 AI_WORKFLOW_PATH = "f:\\goting\\Cognot\\AI-Workflow-master\\AI-Workflow-master"
@@ -139,5 +139,18 @@ class AIWorkflowExecutor:
         # 执行AI工作流
         return await self.execute_ai_workflow(ai_workflow)
 
-# 创建全局执行器实例
-ai_workflow_executor = AIWorkflowExecutor()
+# 全局执行器实例在首次使用时创建，导入本模块时不加载AI工作流环境
+_ai_workflow_executor: Optional[AIWorkflowExecutor] = None
+
+def get_ai_workflow_executor() -> AIWorkflowExecutor:
+    """获取全局执行器实例，首次调用时创建"""
+    global _ai_workflow_executor
+    if _ai_workflow_executor is None:
+        _ai_workflow_executor = AIWorkflowExecutor()
+    return _ai_workflow_executor
+
+def __getattr__(name: str) -> Any:
+    # 兼容 `from core.ai_workflow_executor import ai_workflow_executor`
+    if name == "ai_workflow_executor":
+        return get_ai_workflow_executor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,6 +3,7 @@
 from typing import Any, Dict, Type, Optional, List, Literal
 from enum import Enum
 from pydantic import BaseModel, Field
+from api.utils import fast_clone
 
 class WidgetType(str, Enum):
     HANDLE = "handle"           
@@ -45,6 +46,18 @@ class BaseNode:
     @classmethod
     def get_input_schema(cls) -> Dict[str, Any]:
         
+        # Inputs定义在类创建后不再变化，schema在每个子类上只生成一次
+        # 通过cls.__dict__查找，子类不会误用父类的缓存
+        cached = cls.__dict__.get("_input_schema_cache")
+        if cached is None:
+            cached = cls._build_input_schema()
+            cls._input_schema_cache = cached
+        # 返回副本，调用方修改结果不会污染缓存
+        return fast_clone(cached)
+    
+    @classmethod
+    def _build_input_schema(cls) -> Dict[str, Any]:
+        
         schema = cls.Inputs.model_json_schema()
         properties = schema.get("properties", {})
         
@@ -54,7 +67,8 @@ class BaseNode:
             if name in cls.Inputs.model_fields:
                 field = cls.Inputs.model_fields[name]
                 if field.json_schema_extra:
-                    prop["metadata"] = field.json_schema_extra
+                    # 复制一份，避免缓存的schema与字段定义共享同一个字典
+                    prop["metadata"] = dict(field.json_schema_extra)
                 
                 
                 
@@ -88,7 +102,11 @@ class BaseNode:
     @classmethod
     def get_output_schema(cls) -> Dict[str, Any]:
         
-        return cls.Outputs.model_json_schema()
+        cached = cls.__dict__.get("_output_schema_cache")
+        if cached is None:
+            cached = cls.Outputs.model_json_schema()
+            cls._output_schema_cache = cached
+        return fast_clone(cached)
 
 def text_input(default: Any = None, description: str = "", label: Optional[str] = None, display_mode: Literal["widget", "handle", "auto"] = "auto") -> Any:
     
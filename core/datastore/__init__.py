@@ -1,11 +1,12 @@
 
 from .datastore import DataStore, DataStoreConfig
 from .memory_storage import MemoryStorage
-from .cache_strategy import LRUCacheStrategy
+from .cache_strategy import LRUCacheStrategy, TTLCacheStrategy
 
 __all__ = [
     'DataStore',
     'DataStoreConfig',
     'MemoryStorage',
-    'LRUCacheStrategy'
+    'LRUCacheStrategy',
+    'TTLCacheStrategy'
 ]
@@ -1,5 +1,6 @@
 
-from typing import Any, Optional, Dict, OrderedDict
+import time
+from typing import Any, Optional, Dict, OrderedDict, Tuple
 from .interfaces import CacheStrategyInterface
 
 class LRUCacheStrategy(CacheStrategyInterface):
@@ -112,3 +113,80 @@ class FIFOCacheStrategy(CacheStrategyInterface):
             "size": len(self.cache),
             "capacity": self.capacity
         }
+
+class TTLCacheStrategy(CacheStrategyInterface):
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        
+        # 键 -> (过期时间, 值)，按最近使用顺序排列
+        self.cache: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        if entry[0] <= time.monotonic():
+            
+            del self.cache[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        
+        self.cache.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: str, value: Any) -> None:
+        
+        now = time.monotonic()
+        if key in self.cache:
+            
+            self.cache.move_to_end(key)
+        else:
+            
+            # 先清理队首已过期的条目，仍然满时淘汰最久未使用的条目
+            while self.cache and next(iter(self.cache.values()))[0] <= now:
+                self.cache.popitem(last=False)
+                self.expirations += 1
+            if len(self.cache) >= self.capacity:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        
+        self.cache[key] = (now + self.ttl, value)
+    
+    def delete(self, key: str) -> None:
+        
+        if key in self.cache:
+            del self.cache[key]
+    
+    def clear(self) -> None:
+        
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get_stats(self) -> Dict[str, int]:
+        
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self.cache),
+            "capacity": self.capacity
+        }
+    
+    def size(self) -> int:
+        
+        return len(self.cache)
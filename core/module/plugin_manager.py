@@ -12,13 +12,21 @@ import json
 import time
 import tempfile
 import uuid
-from typing import Dict, Optional, List, Type, Tuple
+from typing import Any, Dict, Optional, List, Type, Tuple
 from .module_manager import ModuleManager, ModuleState
 from .module_interface import Module, ModuleMetadata
 from api.config_manager.config_manager import config_manager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 并发安装插件时git克隆可以并行，但多个pip进程同时写入同一site-packages并不安全，依赖安装逐个执行
+_pip_install_lock = asyncio.Lock()
+
 
 class PluginManager(ModuleManager):
     """
@@ -52,6 +60,13 @@ class PluginManager(ModuleManager):
         self._index_cache_duration = 3600  # 缓存有效期（秒）
         # 反向索引，用于快速查找节点对应的插件
         self._reverse_index: Dict[str, str] = {}  # 键为节点名，值为git_url
+        # 索引的本地缓存文件，重启后在有效期内无需重新下载和解析远程索引
+        self._index_cache_file = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "plugin_index_cache.json"
+        )
+        
+        # 已激活插件列表的序列化缓存，插件激活、停用或卸载时失效
+        self._plugins_listing: Optional[bytes] = None
         
         # 加载用户自定义仓库配置
         self._load_custom_repositories()
@@ -71,6 +86,29 @@ class PluginManager(ModuleManager):
             self._plugin_dirs.append(plugin_dir)
             logger.info(f"Added plugin directory: {plugin_dir}")
 
+    def _scan_plugin_dir(self, plugin_dir: str) -> List[str]:
+        """
+        扫描插件目录，返回候选插件路径
+        
+        Args:
+            plugin_dir: 插件目录路径
+            
+        Returns:
+            包含__init__.py的子目录和单文件插件的路径列表
+        """
+        candidates = []
+        # scandir直接提供条目类型，无需对每个条目单独stat
+        with os.scandir(plugin_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # 检查目录中是否有__init__.py文件
+                    if os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                        candidates.append(entry.path)
+                # 检查是否是.py文件（单文件插件）
+                elif entry.name.endswith(".py") and not entry.name.startswith("_"):
+                    candidates.append(entry.path)
+        return candidates
+
     async def discover_plugins(self) -> List[str]:
         """
         发现插件目录中的所有插件
@@ -81,30 +119,17 @@ class PluginManager(ModuleManager):
         discovered_plugins = []
         
         for plugin_dir in self._plugin_dirs:
-            # 遍历插件目录
-            for item in os.listdir(plugin_dir):
-                item_path = os.path.join(plugin_dir, item)
-                
-                # 检查是否是目录
-                if os.path.isdir(item_path):
-                    # 检查目录中是否有__init__.py文件
-                    if os.path.isfile(os.path.join(item_path, "__init__.py")):
-                        try:
-                            # 尝试加载插件元数据
-                            plugin_id = await self._load_plugin_metadata(item_path)
-                            if plugin_id:
-                                discovered_plugins.append(plugin_id)
-                        except Exception as e:
-                            logger.error(f"Error discovering plugin {item}: {e}")
-                
-                # 检查是否是.py文件（单文件插件）
-                elif item.endswith(".py") and not item.startswith("_"):
-                    try:
-                        plugin_id = await self._load_plugin_metadata(item_path)
-                        if plugin_id:
-                            discovered_plugins.append(plugin_id)
-                    except Exception as e:
-                        logger.error(f"Error discovering plugin {item}: {e}")
+            # 在线程池中扫描插件目录，不阻塞事件循环
+            candidates = await asyncio.to_thread(self._scan_plugin_dir, plugin_dir)
+            
+            for item_path in candidates:
+                try:
+                    # 尝试加载插件元数据
+                    plugin_id = await self._load_plugin_metadata(item_path)
+                    if plugin_id:
+                        discovered_plugins.append(plugin_id)
+                except Exception as e:
+                    logger.error(f"Error discovering plugin {os.path.basename(item_path)}: {e}")
         
         return discovered_plugins
 
@@ -137,6 +162,47 @@ class PluginManager(ModuleManager):
             logger.error(f"Error loading plugin {plugin_path}: {e}")
             return None
 
+    async def activate_module(self, module_id: str) -> bool:
+        try:
+            return await super().activate_module(module_id)
+        finally:
+            self._plugins_listing = None
+
+    async def deactivate_module(self, module_id: str) -> bool:
+        try:
+            return await super().deactivate_module(module_id)
+        finally:
+            self._plugins_listing = None
+
+    def get_plugins_listing(self) -> bytes:
+        """
+        获取已激活插件列表的JSON，结果会被缓存直到插件状态变化
+        
+        Returns:
+            {"plugins": [...]} 序列化后的JSON字节串
+        """
+        listing = self._plugins_listing
+        if listing is None:
+            plugins = []
+            for plugin_id in self.get_activated_modules():
+                plugin_instance = self._modules.get(plugin_id)
+                if plugin_instance and plugin_instance.module:
+                    metadata = plugin_instance.module.metadata
+                    plugins.append({
+                        "id": metadata.id,
+                        "name": metadata.name,
+                        "version": metadata.version,
+                        "description": metadata.description,
+                        "status": plugin_instance.state.value
+                    })
+            data = {"plugins": plugins}
+            if orjson is not None:
+                listing = orjson.dumps(data)
+            else:
+                listing = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self._plugins_listing = listing
+        return listing
+
     async def unload_plugin(self, plugin_id: str) -> bool:
         """
         卸载插件
@@ -159,6 +225,7 @@ class PluginManager(ModuleManager):
             # 从模块管理器中移除模块
             if plugin_id in self._modules:
                 del self._modules[plugin_id]
+            self._plugins_listing = None
             
             logger.info(f"Plugin unloaded successfully: {plugin_id}")
             return True
@@ -280,6 +347,75 @@ class PluginManager(ModuleManager):
         except Exception as e:
             logger.error(f"Failed to save custom repositories: {e}")
     
+    def _load_index_from_disk(self) -> bool:
+        """
+        从本地缓存文件加载插件索引
+        
+        Returns:
+            缓存文件存在、未过期且与当前仓库配置一致时返回True
+        """
+        try:
+            mtime = os.stat(self._index_cache_file).st_mtime
+            if time.time() - mtime >= self._index_cache_duration:
+                return False
+            
+            with open(self._index_cache_file, "rb") as f:
+                data = f.read()
+            cached = orjson.loads(data) if orjson is not None else json.loads(data)
+            
+            # 缓存生成后仓库配置有变化（包括在其他进程中修改后重启）时视为未命中
+            if (cached.get("repositories") != sorted(self._custom_repositories)
+                    or cached.get("disabled_repositories") != sorted(self._disabled_repositories)):
+                return False
+            
+            self._index_cache = cached["index"]
+            self._reverse_index = cached["reverse_index"]
+            self._index_last_updated = mtime
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Failed to load plugin index cache: {e}")
+            return False
+    
+    def _save_index_to_disk(self) -> None:
+        """
+        将插件索引和反向索引写入本地缓存文件
+        """
+        try:
+            cached = {
+                "repositories": sorted(self._custom_repositories),
+                "disabled_repositories": sorted(self._disabled_repositories),
+                "index": self._index_cache,
+                "reverse_index": self._reverse_index
+            }
+            if orjson is not None:
+                data = orjson.dumps(cached)
+            else:
+                data = json.dumps(cached, ensure_ascii=False).encode("utf-8")
+            
+            os.makedirs(os.path.dirname(self._index_cache_file), exist_ok=True)
+            tmp_file = f"{self._index_cache_file}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, self._index_cache_file)
+        except Exception as e:
+            logger.warning(f"Failed to save plugin index cache: {e}")
+    
+    def _invalidate_index(self) -> None:
+        """
+        清除内存和本地的插件索引缓存
+        """
+        self._index_cache = {}
+        self._reverse_index = {}
+        self._index_last_updated = 0
+        try:
+            os.remove(self._index_cache_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove plugin index cache: {e}")
+    
     async def fetch_and_cache_index(self, force_refresh: bool = False) -> bool:
         """
         获取并缓存插件索引
@@ -297,6 +433,11 @@ class PluginManager(ModuleManager):
                 logger.info("Using cached plugin index")
                 return True
             
+            # 本地缓存文件仍在有效期内时直接加载，避免重新下载和解析远程索引
+            if not force_refresh and self._load_index_from_disk():
+                logger.info(f"Loaded plugin index from local cache with {len(self._index_cache)} plugins")
+                return True
+            
             # 获取代理配置
             proxies = self._get_proxies()
             
@@ -392,6 +533,7 @@ class PluginManager(ModuleManager):
                         self._reverse_index[node] = git_url
             
             self._index_last_updated = current_time
+            self._save_index_to_disk()
             logger.info(f"Successfully fetched and cached plugin index with {len(self._index_cache)} plugins")
             return True
         except Exception as e:
@@ -689,6 +831,8 @@ class PluginManager(ModuleManager):
             
         self._custom_repositories.append(repo_url)
         self._save_custom_repositories()
+        # 清除缓存，以便下次获取索引时包含新仓库
+        self._invalidate_index()
         logger.info(f"Added custom repository: {repo_url}")
         return True
     
@@ -708,6 +852,8 @@ class PluginManager(ModuleManager):
             
         self._custom_repositories.remove(repo_url)
         self._save_custom_repositories()
+        # 清除缓存，以便下次获取索引时不再包含该仓库
+        self._invalidate_index()
         logger.info(f"Removed custom repository: {repo_url}")
         return True
     
@@ -732,9 +878,7 @@ class PluginManager(ModuleManager):
         self._disabled_repositories.append(repo_url)
         self._save_custom_repositories()
         # 清除缓存，以便下次获取索引时应用禁用设置
-        self._index_cache = {}
-        self._reverse_index = {}
-        self._index_last_updated = 0
+        self._invalidate_index()
         logger.info(f"Disabled repository: {repo_url}")
         return True
     
@@ -760,9 +904,7 @@ class PluginManager(ModuleManager):
             
         self._save_custom_repositories()
         # 清除缓存，以便下次获取索引时应用启用设置
-        self._index_cache = {}
-        self._reverse_index = {}
-        self._index_last_updated = 0
+        self._invalidate_index()
         logger.info(f"Enabled repository: {repo_url}")
         return True
     
@@ -913,9 +1055,10 @@ class PluginManager(ModuleManager):
             
             logger.info(f"Attempting to install plugin/extension from {git_url}")
             
+            # git/pip子进程在线程池中运行，多个插件可以并发安装而不阻塞事件循环
             # 检查git命令是否可用
             try:
-                subprocess.check_output(["git", "--version"], stderr=subprocess.STDOUT)
+                await asyncio.to_thread(subprocess.check_output, ["git", "--version"], stderr=subprocess.STDOUT)
                 logger.info("Git command found")
             except (subprocess.CalledProcessError, FileNotFoundError) as git_err:
                 error_msg = f"Git command not found or not working: {git_err}"
@@ -927,13 +1070,13 @@ class PluginManager(ModuleManager):
             try:
                 # 查看仓库的根目录结构，判断是否为ComfyUI扩展
                 # 使用git ls-remote查看仓库文件
-                subprocess.check_output(["git", "ls-remote", "--quiet", git_url], shell=True)
+                await asyncio.to_thread(subprocess.check_output, ["git", "ls-remote", "--quiet", git_url], shell=True)
                 
                 # 克隆到临时目录进行分析
                 temp_dir = os.path.join(tempfile.gettempdir(), f"comfyui_ext_check_{uuid.uuid4()}")
                 os.makedirs(temp_dir, exist_ok=True)
                 
-                subprocess.check_call(["git", "clone", "--depth", "1", git_url, temp_dir], shell=True)
+                await asyncio.to_thread(subprocess.check_call, ["git", "clone", "--depth", "1", git_url, temp_dir], shell=True)
                 
                 # 检查是否包含ComfyUI扩展的特征文件
                 if os.path.exists(os.path.join(temp_dir, "__init__.py")):
@@ -959,7 +1102,7 @@ class PluginManager(ModuleManager):
                 
                 # 克隆仓库
                 try:
-                    subprocess.check_call(["git", "clone", git_url, extension_path], shell=True)
+                    await asyncio.to_thread(subprocess.check_call, ["git", "clone", git_url, extension_path], shell=True)
                     logger.info(f"Successfully cloned ComfyUI extension to {extension_path}")
                 except subprocess.CalledProcessError as clone_err:
                     error_msg = f"Error cloning ComfyUI extension {git_url}: {clone_err}"
@@ -971,9 +1114,10 @@ class PluginManager(ModuleManager):
                 if os.path.exists(requirements_file):
                     logger.info(f"Installing dependencies for ComfyUI extension from {requirements_file}")
                     try:
-                        subprocess.check_call([
-                            sys.executable, "-m", "pip", "install", "-r", requirements_file
-                        ])
+                        async with _pip_install_lock:
+                            await asyncio.to_thread(subprocess.check_call, [
+                                sys.executable, "-m", "pip", "install", "-r", requirements_file
+                            ])
                         logger.info(f"Successfully installed dependencies for ComfyUI extension {plugin_name}")
                     except subprocess.CalledProcessError as pip_err:
                         logger.error(f"Error installing dependencies for ComfyUI extension {plugin_name}: {pip_err}")
@@ -998,7 +1142,7 @@ class PluginManager(ModuleManager):
                 
                 # 克隆仓库
                 try:
-                    subprocess.check_call(["git", "clone", git_url, plugin_path], shell=True)
+                    await asyncio.to_thread(subprocess.check_call, ["git", "clone", git_url, plugin_path], shell=True)
                     logger.info(f"Successfully cloned repository to {plugin_path}")
                 except subprocess.CalledProcessError as clone_err:
                     error_msg = f"Error cloning repository {git_url}: {clone_err}"
@@ -1010,9 +1154,10 @@ class PluginManager(ModuleManager):
                 if os.path.exists(requirements_file):
                     logger.info(f"Installing dependencies from {requirements_file}")
                     try:
-                        subprocess.check_call([
-                            sys.executable, "-m", "pip", "install", "-r", requirements_file
-                        ])
+                        async with _pip_install_lock:
+                            await asyncio.to_thread(subprocess.check_call, [
+                                sys.executable, "-m", "pip", "install", "-r", requirements_file
+                            ])
                         logger.info(f"Successfully installed dependencies for plugin {plugin_name}")
                     except subprocess.CalledProcessError as pip_err:
                         logger.error(f"Error installing dependencies for plugin {plugin_name}: {pip_err}")
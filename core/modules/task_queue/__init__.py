@@ -302,7 +302,8 @@ class TaskQueueManager:
     
     def get_queue_info(self) -> Dict[str, Any]:
         """获取队列信息"""
-        stats = self.get_statistics()
+        # 执行队列维护的是计数器，直接读取即可，无需遍历所有工作流任务统计状态分布
+        stats = self.execution_queue.get_statistics()
         return {
             "queued": stats.get('pending', 0),
             "started": stats.get('running', 0),
@@ -343,7 +344,6 @@ class TaskQueueModule(Module):
         logger.info(f"Activating {self.metadata.name} (v{self.metadata.version})")
         
         # 获取工作流模块API
-        from core.module.module_manager import module_manager
         workflow_module_api = module_manager.get_module_api('workflow')
         if not workflow_module_api:
             raise Exception("Workflow module not found")
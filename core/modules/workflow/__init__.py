@@ -1,5 +1,6 @@
 # Workflow Module
 
+import json
 import logging
 from core.module.module_registrar import ModuleRegistrationOptions, register_module
 from core.module.module_registrar import create_module_api
@@ -54,7 +55,6 @@ def export_workflow(workflow_data):
     Returns:
         JSON string of the workflow
     """
-    import json
     return json.dumps(workflow_data, indent=2)
 
 
@@ -68,8 +68,6 @@ def import_workflow(workflow_json):
     Returns:
         Dictionary containing success, workflow, and errors
     """
-    import json
-    
     try:
         workflow_data = json.loads(workflow_json)
         validation = validate_workflow(workflow_data)
@@ -26,6 +26,9 @@ class NodeRegistry:
         
         self.third_party_nodes_dir = os.path.join(os.getcwd(), "third_party_nodes")
         
+        # 注册表版本号，节点每次增删时递增，供上层按版本缓存元数据
+        self._version = 0
+        
         self._load_metadata()
         
         self._load_third_party_repos()
@@ -179,6 +182,7 @@ class NodeRegistry:
                     
                     self._node_functions[name] = func
                 
+                self._version += 1
                 self._save_metadata()
                 return obj
         
@@ -248,6 +252,7 @@ class NodeRegistry:
                 
                 self._node_functions[name] = func
             
+            self._version += 1
             self._save_metadata()
             return obj
         else:
@@ -275,6 +280,10 @@ class NodeRegistry:
         
         return self._node_rollback_functions.get(node_type)
     
+    def get_version(self) -> int:
+        
+        return self._version
+    
     def get_all_nodes(self) -> Dict[str, Dict[str, Any]]:
         
         
@@ -326,6 +335,7 @@ class NodeRegistry:
         if node_type in self._node_rollback_functions:
             del self._node_rollback_functions[node_type]
         
+        self._version += 1
         self._save_metadata()
         return node_type not in self._nodes and node_type not in self._node_functions
     
@@ -336,21 +346,25 @@ class NodeRegistry:
         self._node_functions.clear()
         self._node_rollback_functions.clear()
         
+        self._version += 1
         self._save_metadata()
         return count
     
     def validate_workflow(self, workflow: Dict[str, Any]) -> List[str]:
         """验证工作流中使用的节点是否都已安装"""
-        missing_nodes = []
-        
-        if "nodes" in workflow:
-            for node in workflow["nodes"]:
-                node_type = node.get("type")
-                if node_type and node_type not in self._nodes:
-                    if node_type not in missing_nodes:
-                        missing_nodes.append(node_type)
-        
-        return missing_nodes
+        nodes = workflow.get("nodes")
+        if not nodes:
+            return []
+        
+        # 注册表本身就是哈希表，直接做成员判断；用字典按出现顺序去重，避免在列表中线性查找
+        registered = self._nodes
+        missing_nodes = {}
+        for node in nodes:
+            node_type = node.get("type")
+            if node_type and node_type not in registered:
+                missing_nodes[node_type] = None
+        
+        return list(missing_nodes)
     
     def add_third_party_repo(self, repo: Dict[str, Any]) -> None:
         """添加第三方节点仓库"""
@@ -54,6 +54,7 @@ class NodeManagerPlugin(Module):
             "register_node": self._node_registry.register_node,
             "get_node_metadata": self._node_registry.get_node_metadata,
             "get_all_nodes": self._node_registry.get_all_nodes,
+            "get_registry_version": self._node_registry.get_version,
             "get_node_by_id": self._node_registry.get_node_by_id,
             "remove_node": self._node_registry.remove_node,
             
@@ -0,0 +1,74 @@
+import io
+import os
+from collections import OrderedDict
+
+from api.file_handler.file_handler import FileHandler
+
+
+def _upload_png(handler):
+    return handler.upload_file(io.BytesIO(b"\x89PNG data"), "image/png", "a.png")
+
+
+def test_get_file_info_with_absolute_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = FileHandler("./uploads")
+    uploaded = _upload_png(handler)
+
+    info = handler.get_file_info(os.path.abspath(uploaded["storage_path"]))
+
+    assert info is not None
+    assert info["relative_path"] == uploaded["relative_path"]
+    assert info["file_type"] == "images"
+    assert info["file_size"] == uploaded["file_size"]
+
+
+def test_get_file_info_with_dot_prefixed_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = FileHandler("./uploads")
+    uploaded = _upload_png(handler)
+
+    info = handler.get_file_info("./" + uploaded["storage_path"])
+
+    assert info is not None
+    assert info["relative_path"] == uploaded["relative_path"]
+    assert info["file_type"] == "images"
+
+
+def test_get_file_info_rejects_path_outside_upload_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secret.txt").write_text("x")
+    handler = FileHandler("./uploads")
+
+    assert handler.get_file_info("../secret.txt") is None
+    assert handler.get_file_info(str(tmp_path / "secret.txt")) is None
+
+
+def test_stat_cache_hit_refreshes_lru_position(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = FileHandler("./uploads")
+    first = _upload_png(handler)["storage_path"]
+    second = _upload_png(handler)["storage_path"]
+
+    handler.get_file_info(first)
+    handler.get_file_info(second)
+    handler.get_file_info(first)
+
+    assert list(handler._stat_cache) == [second, first]
+
+
+def test_stat_cache_hit_survives_concurrent_eviction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = FileHandler("./uploads")
+    path = _upload_png(handler)["storage_path"]
+    handler.get_file_info(path)
+
+    # 模拟get之后、move_to_end之前条目被其他线程清除
+    class EvictingCache(OrderedDict):
+        def get(self, key, default=None):
+            value = super().get(key, default)
+            self.clear()
+            return value
+
+    handler._stat_cache = EvictingCache(handler._stat_cache)
+
+    assert handler.get_file_info(path) is not None